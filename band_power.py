@@ -0,0 +1,239 @@
+"""
+Band-power estimators for filtered EEG bands.
+
+RunningBandPower keeps a running sum of squares over a sliding window, and
+ExponentialBandPower an exponentially weighted mean square, so updating the
+power costs O(1) per sample regardless of the window length. WelchBandPower
+skips band-pass filtering altogether and estimates every band from one Welch
+PSD of the raw signal, recomputed only once per hop.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import fft
+from scipy.signal import get_window, lfilter
+
+from ring_buffer import RingBuffer
+
+
+def rolling_band_power(buffer, n_new, window=50):
+    """
+    RMS power over a trailing window for each of the newest samples of a buffer.
+
+    Equivalent to calling calculate_band_power(buffer[:i + 1][-window:]) for the
+    last n_new positions, but computed in one vectorized pass. Leading axes
+    (bands, channels) are processed together; time is the last axis.
+    Args:
+        buffer (np.ndarray): Band buffer (oldest first), at least n_new + window - 1 long
+        n_new (int): Number of newest samples to compute the power for
+        window (int): RMS window length in samples
+    Returns:
+        np.ndarray: RMS power for each of the n_new newest samples, shape (..., n_new)
+    """
+    tail = buffer[..., -(n_new + window - 1):]
+    cumsum = np.cumsum(np.square(tail), axis=-1)
+    cumsum = np.concatenate((np.zeros(cumsum.shape[:-1] + (1,)), cumsum), axis=-1)
+    return np.sqrt((cumsum[..., window:] - cumsum[..., :-window]) / window)
+
+
+class RunningBandPower:
+    """Sliding-window RMS power updated in O(1) per sample."""
+
+    def __init__(self, window=50, n_channels=None, resum_every=1024):
+        """
+        Args:
+            window (int): RMS window length in samples
+            n_channels (int or tuple): Channel shape, e.g. (n_bands, n_channels), None for 1-D
+            resum_every (int): Recompute the sum of squares from scratch every this
+                many samples, so floating-point drift cannot accumulate
+        """
+        self.window = int(window)
+        self.resum_every = resum_every
+        # The window starts zero-filled, like the np.zeros band buffers it replaces
+        self._values = RingBuffer(self.window, n_channels=n_channels)
+        self._sum_sq = np.zeros(self._values.last().shape[:-1])
+        self._since_resum = 0
+
+    def _power(self):
+        return np.sqrt(np.maximum(self._sum_sq, 0.0) / self.window)
+
+    def update(self, value):
+        """
+        Add one sample (scalar or channel-shaped array) and drop the oldest.
+        Returns:
+            RMS power over the window, same shape as value
+        """
+        value = np.asarray(value, dtype=float)
+        oldest = self._values.last()[..., 0]
+        self._sum_sq = self._sum_sq + value * value - oldest * oldest
+        self._values.append(value)
+        self._since_resum += 1
+        if self._since_resum >= self.resum_every:
+            self._sum_sq = np.sum(np.square(self._values.last()), axis=-1)
+            self._since_resum = 0
+        return self._power()
+
+    def update_chunk(self, values):
+        """
+        Add a chunk of samples (time on the last axis).
+        Returns:
+            np.ndarray: RMS power after each new sample, shape (..., n)
+        """
+        values = np.asarray(values, dtype=float)
+        n = values.shape[-1]
+        if n == 0:
+            return np.empty(values.shape)
+        history = self._values.last(self.window - 1)
+        power = rolling_band_power(np.concatenate((history, values), axis=-1), n, self.window)
+        self._values.extend(values)
+        # Re-sum the window once per chunk; this also resets any drift
+        self._sum_sq = np.sum(np.square(self._values.last()), axis=-1)
+        self._since_resum = 0
+        return power
+
+    @property
+    def power(self):
+        """Current RMS power over the window."""
+        return self._power()
+
+
+class ExponentialBandPower:
+    """Exponentially weighted RMS power updated in O(1) per sample."""
+
+    def __init__(self, window=50, n_channels=None):
+        """
+        Args:
+            window (float): Equivalent window length in samples (alpha = 2 / (window + 1))
+            n_channels (int or tuple): Channel shape, e.g. (n_bands, n_channels), None for 1-D
+        """
+        self.alpha = 2.0 / (window + 1.0)
+        if n_channels is None:
+            shape = ()
+        elif isinstance(n_channels, tuple):
+            shape = n_channels
+        else:
+            shape = (n_channels,)
+        self._mean_sq = np.zeros(shape)
+
+    def update(self, value):
+        """
+        Add one sample (scalar or channel-shaped array).
+        Returns:
+            Exponentially weighted RMS power, same shape as value
+        """
+        value = np.asarray(value, dtype=float)
+        self._mean_sq = self._mean_sq + self.alpha * (value * value - self._mean_sq)
+        return np.sqrt(self._mean_sq)
+
+    def update_chunk(self, values):
+        """
+        Add a chunk of samples (time on the last axis).
+        Returns:
+            np.ndarray: RMS power after each new sample, shape (..., n)
+        """
+        values = np.asarray(values, dtype=float)
+        if values.shape[-1] == 0:
+            return np.empty(values.shape)
+        decay = 1.0 - self.alpha
+        zi = (decay * self._mean_sq)[..., None]
+        mean_sq, _ = lfilter([self.alpha], [1.0, -decay], np.square(values), axis=-1, zi=zi)
+        self._mean_sq = mean_sq[..., -1]
+        return np.sqrt(mean_sq)
+
+    @property
+    def power(self):
+        """Current RMS power."""
+        return np.sqrt(self._mean_sq)
+
+
+class WelchBandPower:
+    """Band RMS amplitudes from a Welch PSD of the raw signal, recomputed once per hop."""
+
+    def __init__(self, srate, band_ranges, window_seconds=2.0, segment_seconds=1.0, hop_seconds=0.25,
+                 n_channels=None):
+        """
+        Args:
+            srate (float): Sampling rate in Hz
+            band_ranges (list): List of (low, high) frequency ranges in Hz
+            window_seconds (float): Length of raw signal the PSD is estimated from
+            segment_seconds (float): Welch segment length (sets the frequency resolution)
+            hop_seconds (float): How often a new estimate is computed
+            n_channels (int or tuple): Channel shape, None for a single 1-D channel
+        """
+        self.srate = float(srate)
+        self.nperseg = int(segment_seconds * self.srate)
+        self.step = self.nperseg // 2  # 50% segment overlap
+        self.hop = max(1, int(round(hop_seconds * self.srate)))
+        self._buffer = RingBuffer(max(int(window_seconds * self.srate), self.nperseg), n_channels=n_channels)
+        self._since_hop = 0
+        self._power = None
+
+        # Everything that does not depend on the data is computed once here
+        self._window = get_window('hann', self.nperseg)
+        freqs = fft.rfftfreq(self.nperseg, 1.0 / self.srate)
+        df = freqs[1] - freqs[0]
+        # One-sided PSD scaling (x2) folded together with the bin width
+        scale = 2.0 * df / (self.srate * np.sum(self._window ** 2))
+        # (n_freqs, n_bands) weights: summing PSD bins in [low, high) for every band is one matmul
+        self._band_weights = np.stack([((freqs >= low) & (freqs < high)) * scale
+                                       for low, high in band_ranges], axis=-1)
+
+    def compute(self):
+        """
+        Estimate band powers from the current window.
+        Returns:
+            np.ndarray: RMS amplitude per band, shape (n_bands,) or (n_bands, *channels)
+        """
+        data = self._buffer.last()
+        segments = sliding_window_view(data, self.nperseg, axis=-1)[..., ::self.step, :]
+        segments = segments - segments.mean(axis=-1, keepdims=True)
+        spectrum = fft.rfft(segments * self._window, axis=-1)
+        psd = np.mean(spectrum.real ** 2 + spectrum.imag ** 2, axis=-2)
+        band_power = psd @ self._band_weights
+        self._power = np.sqrt(np.moveaxis(band_power, -1, 0))
+        return self._power
+
+    def update_chunk_hops(self, values):
+        """
+        Add raw samples (time on the last axis) and compute one estimate for every
+        hop that ends inside them; the chunk is split at the hop boundaries, so the
+        estimates do not depend on how the samples were chunked.
+        Returns:
+            tuple: (ends, powers) lists: the index in values of the last sample of each
+            estimate and its band RMS amplitudes; empty while the window is not full yet
+        """
+        values = np.asarray(values, dtype=float)
+        n = values.shape[-1]
+        ends, powers = [], []
+        pos = 0
+        while pos < n:
+            take = min(n - pos, self.hop - self._since_hop)
+            self._buffer.extend(values[..., pos:pos + take])
+            pos += take
+            self._since_hop += take
+            if self._since_hop == self.hop:
+                self._since_hop = 0
+                if len(self._buffer) >= self._buffer.capacity:
+                    ends.append(pos - 1)
+                    powers.append(self.compute())
+        return ends, powers
+
+    def update_chunk(self, values):
+        """
+        Add raw samples (time on the last axis) and recompute if a hop has elapsed.
+        Only the newest estimate is returned; use update_chunk_hops for one per hop.
+        Returns:
+            np.ndarray or None: New band RMS amplitudes, or None if no hop was due
+            (or the window is not full yet)
+        """
+        _, powers = self.update_chunk_hops(values)
+        return powers[-1] if powers else None
+
+    def update(self, value):
+        """Add one raw sample; same return value as update_chunk."""
+        return self.update_chunk(np.asarray(value, dtype=float)[..., None])
+
+    @property
+    def power(self):
+        """Most recent band RMS amplitudes, or None before the first estimate."""
+        return self._power
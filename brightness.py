@@ -1,5 +1,7 @@
+import sys
 import time
-import screen_brightness_control as sbc
+import threading
+import subprocess
 
 # def flicker_brightness():
 #     try:
@@ -13,30 +15,194 @@ import screen_brightness_control as sbc
 #         print("Error adjusting brightness:", e)
 
 
-def set_brightness(brightness):
-    """Set brightness using PowerShell WMI"""
-    try:
-        subprocess.run([
-            'powershell',
-            f'(Get-WmiObject -Namespace root/WMI -Class WmiMonitorBrightnessMethods).WmiSetBrightness(1, {brightness})'
-        ], shell=True)
-        return True
-    except:
-        return False
-
-def flicker_brightness():
-    try:
-        original = get_brightness()
+class BrightnessBackend:
+    """Interface for a screen brightness control channel (levels are 0 - 100)."""
+
+    def get_brightness(self):
+        raise NotImplementedError
+
+    def set_brightness(self, brightness):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class PowerShellBrightnessBackend(BrightnessBackend):
+    """
+    Windows WMI brightness through one long-lived PowerShell process.
+    Commands are streamed to its stdin, so a brightness change costs a pipe
+    write instead of starting a new powershell.exe (hundreds of ms) each time.
+    """
+
+    _END = '__brightness_done__'
+
+    def __init__(self):
+        creationflags = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+        self._process = subprocess.Popen(
+            ['powershell', '-NoLogo', '-NoProfile', '-NonInteractive', '-Command', '-'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, bufsize=1, creationflags=creationflags)
+        self._lock = threading.Lock()
+        # Look the WMI methods object up once and keep it in the session
+        self._send('$hfMethods = Get-WmiObject -Namespace root/WMI -Class WmiMonitorBrightnessMethods')
+
+    def _send(self, command):
+        self._process.stdin.write(command + '\n')
+        self._process.stdin.flush()
+
+    def get_brightness(self):
+        with self._lock:
+            self._send('Get-WmiObject -Namespace root/WMI -Class WmiMonitorBrightness '
+                       '| Select-Object -ExpandProperty CurrentBrightness')
+            self._send(f"Write-Output '{self._END}'")
+            value = None
+            for line in self._process.stdout:
+                line = line.strip()
+                if line == self._END:
+                    break
+                if value is None and line.isdigit():
+                    value = int(line)
+            return value
+
+    def set_brightness(self, brightness):
+        with self._lock:
+            self._send(f'$hfMethods.WmiSetBrightness(1, {int(brightness)}) | Out-Null')
+
+    def close(self):
+        with self._lock:
+            try:
+                self._send('exit')
+                self._process.wait(timeout=2)
+            except Exception:
+                self._process.kill()
+
+
+class SimulatedBrightnessBackend(BrightnessBackend):
+    """No-op backend that only remembers the level and logs (time, level) changes."""
+
+    def __init__(self, brightness=50):
+        self.brightness = brightness
+        self.log = []
+
+    def get_brightness(self):
+        return self.brightness
+
+    def set_brightness(self, brightness):
+        self.brightness = brightness
+        self.log.append((time.monotonic(), brightness))
+
+
+def default_backend():
+    """A PowerShell session on Windows, otherwise the simulated backend."""
+    if sys.platform == 'win32':
+        return PowerShellBrightnessBackend()
+    return SimulatedBrightnessBackend()
+
+
+class BrightnessController:
+    """Brightness access and the flicker nudge on top of one persistent backend."""
+
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else default_backend()
+        self.last_flicker_timings = []  # (scheduled, actual) offsets in seconds of the last flicker
+
+    def get_brightness(self):
+        return self.backend.get_brightness()
+
+    def set_brightness(self, brightness):
+        try:
+            self.backend.set_brightness(brightness)
+            return True
+        except Exception:
+            return False
+
+    def original_brightness(self):
+        """The current brightness, to restore after a nudge (read every time; 50% if it cannot be read)."""
+        try:
+            original = self.get_brightness()
+        except Exception:
+            original = None
         if original is None:
             print("Could not get current brightness, using default value")
             original = 50  # Default to 50%
-        
+        return original
+
+    def flicker(self, cancel_event=None, pulses=3, dim_level=20, period=0.2, original=None):
+        """
+        Dim and restore the screen `pulses` times.
+        Each change is scheduled against an absolute start time, so command
+        latency does not accumulate; the actual offsets are kept in
+        last_flicker_timings.
+        Args:
+            cancel_event (threading.Event): When set, the flicker stops early; the
+                original brightness is always restored
+            pulses (int): Number of dim/restore pulses
+            dim_level (int): Brightness while dimmed
+            period (float): Seconds each dim and each restore lasts
+            original (int): Brightness to restore; None reads the current brightness first
+        """
+        if original is None:
+            original = self.original_brightness()
+        timings = []
+        start = time.monotonic()
+        try:
+            for step in range(2 * pulses):
+                scheduled = step * period
+                delay = start + scheduled - time.monotonic()
+                if delay > 0:
+                    if cancel_event is not None:
+                        if cancel_event.wait(delay):
+                            break
+                    else:
+                        time.sleep(delay)
+                elif cancel_event is not None and cancel_event.is_set():
+                    break
+                self.set_brightness(dim_level if step % 2 == 0 else original)
+                timings.append((scheduled, time.monotonic() - start))
+        finally:
+            self.set_brightness(original)
+            self.last_flicker_timings = timings
+
+    def close(self):
+        self.backend.close()
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_controller():
+    """Shared BrightnessController, created on first use."""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = BrightnessController()
+        return _controller
+
+
+def get_brightness():
+    """Get the current brightness (0 - 100), or None if it cannot be read"""
+    try:
+        return get_controller().get_brightness()
+    except Exception:
+        return None
+
+def set_brightness(brightness):
+    """Set brightness through the persistent brightness session"""
+    return get_controller().set_brightness(brightness)
+
+def flicker_brightness(cancel_event=None):
+    """
+    Dim and restore the screen three times.
+    Args:
+        cancel_event (threading.Event): When set, the flicker stops early; the
+            original brightness is always restored
+    """
+    try:
+        controller = get_controller()
+        original = controller.original_brightness()
         print(f"Original brightness: {original}%")
-        
-        for _ in range(3):
-            set_brightness(20)    # Dim quickly
-            time.sleep(0.2)
-            set_brightness(original)  # Restore
-            time.sleep(0.2)
+        controller.flicker(cancel_event=cancel_event, original=original)
     except Exception as e:
-        print("Error adjusting brightness:", e)
\ No newline at end of file
+        print("Error adjusting brightness:", e)
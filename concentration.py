@@ -1,22 +1,111 @@
 import numpy as np
+import os
 import time
 from pylsl import StreamInlet, resolve_byprop
-from brainflow.data_filter import DataFilter, FilterTypes, DetrendOperations
 import matplotlib.pyplot as plt
 import pandas as pd
 import threading
-from collections import deque
+import queue
 
-def calculate_band_power(buffer):
-    """Calculate the power of a frequency band using RMS"""
-    return np.sqrt(np.mean(np.square(buffer)))
+from eeg_filters import StreamingFilterBank
+from eeg_stream import ChunkReader
+from band_power import RunningBandPower, WelchBandPower
+from ring_buffer import RingBuffer
+from eeg_hub import EEGHub
+from focus_detector import FocusDetector
+from focus_events import FocusEventBus
+from eeg_replay import open_raw_replay, replay_ratios
+from eeg_synth import SyntheticEEG
+from instrumentation import histogram, dump as dump_latencies, install_signal_dump
 
+# Focus-status transitions published by main(); subscribe instead of polling get_focus_status()
+focus_events = FocusEventBus()
 
-def stream_muse_ratios(duration=5, verbose=True):
+# EEG channels of the Muse LSL stream, in stream order (the 5th channel is Right AUX)
+MUSE_CHANNELS = ['TP9', 'AF7', 'AF8', 'TP10']
+# Stream channels combined into the app's ratio (indices into MUSE_CHANNELS), None for all of them
+CHANNELS = None
+
+# Replay hooks (see use_replay): eeg_source replaces the LSL inlet, ratio_source the whole DSP pipeline
+eeg_source = None  # callable returning (inlet, srate)
+ratio_source = None  # callable returning a (timestamp, ratio) generator for the EEG hub
+lossless_hub = False  # set with the replay hooks: a replay must not drop ratios at any speed (see EEGHub)
+
+# Per-stage latency histograms (see instrumentation.py); the pull includes waiting for data
+_pull_stage = histogram('lsl.pull')
+_filter_stage = histogram('dsp.filter')
+_power_stage = histogram('dsp.band_power')  # band power and ratio
+_welch_stage = histogram('dsp.welch')
+_detector_stage = histogram('focus.detector')
+_plot_stage = histogram('plot.draw')
+# Per-sample stages (pipeline, detector) time one call in this many (clock reads alone would cost ~1% per sample)
+SAMPLE_TIMING_STRIDE = 8
+
+def calculate_band_power(buffer, axis=None):
+    """Calculate the power of a frequency band using RMS (over `axis`, default all samples)"""
+    return np.sqrt(np.mean(np.square(buffer), axis=axis))
+
+
+def _channel_indices(channels):
+    """Stream indices to process: all Muse EEG channels when channels is None."""
+    return list(range(len(MUSE_CHANNELS))) if channels is None else list(channels)
+
+
+def _beta_theta_ratios(beta_power, theta_power):
     """
-    Stream Muse EEG data and yield only the beta/theta ratio.
-    Yields a single value: beta_theta_ratio
+    Per-channel and combined beta/theta ratios from (n_channels, ...) band powers.
+    The combined ratio divides the channel-averaged powers, so one noisy channel
+    with near-zero theta cannot dominate the spatial average.
+    """
+    channel_ratios = beta_power / (theta_power + 1e-10)
+    combined_ratio = np.mean(beta_power, axis=0) / (np.mean(theta_power, axis=0) + 1e-10)
+    return channel_ratios, combined_ratio
+
+
+def use_replay(path, speed=1.0):
+    """
+    Feed a recorded session instead of the headband to every entry point.
+    Raw recordings (.npy) replace the LSL inlet and go through the full DSP
+    pipeline; ratio recordings (.csv, .hfrec) are fed straight to the hub.
+    Also enabled by the HYPERFOCUS_REPLAY (and HYPERFOCUS_REPLAY_SPEED) environment variables.
+    Args:
+        path (str): Recording to replay
+        speed (float): 1.0 for real time, N for N times faster, 0 or None for as fast as possible
+    """
+    global eeg_source, ratio_source, lossless_hub
+    if path.endswith('.npy'):
+        eeg_source, ratio_source = (lambda: open_raw_replay(path, speed=speed)), None
+    else:
+        eeg_source, ratio_source = None, (lambda: replay_ratios(path, speed=speed))
+    lossless_hub = True
+
+
+def use_synthetic(duration=600, speed=1.0, seed=0):
+    """
+    Feed synthetic EEG (eeg_synth.SyntheticEEG) instead of the headband to every entry point.
+    Also enabled with HYPERFOCUS_REPLAY=synthetic.
+    Args:
+        duration (float): Seconds of signal generated per inlet
+        speed (float): 1.0 for real time, N for N times faster, 0 or None for as fast as possible
+        seed (int): Generator seed
     """
+    global eeg_source, ratio_source, lossless_hub
+    eeg_source, ratio_source = (lambda: (SyntheticEEG(seed=seed).inlet(duration, speed=speed), 256.0)), None
+    lossless_hub = True
+
+
+def connect_eeg_stream(verbose=True):
+    """
+    Resolve the first EEG stream on the network and open an inlet to it
+    (or open the replay installed with use_replay).
+    Returns:
+        tuple: (StreamInlet, sampling rate in Hz)
+    """
+    if eeg_source is not None:
+        inlet, srate = eeg_source()
+        if verbose:
+            print(f"Replaying recorded stream: {inlet.info().name()} ({srate} Hz)")
+        return inlet, srate
     # Look for an EEG stream
     if verbose:
         print("Looking for an EEG stream...")
@@ -27,57 +116,233 @@ def stream_muse_ratios(duration=5, verbose=True):
         print(f"Found stream: {streams[0].name()} (type: {streams[0].type()}, rate: {streams[0].nominal_srate()} Hz)")
     inlet = StreamInlet(streams[0])
     srate = float(streams[0].nominal_srate())
-    samples = int(duration * srate)
-    raw_buffer = np.zeros(samples)
-    band_buffers = [np.zeros(samples) for _ in range(3)]  # 3 basic bands: Filtered, Beta, Theta
-    BAND_RANGES = [(1, 50), (13, 30), (4, 8)]
+    return inlet, srate
+
+
+def stream_muse_ratios(duration=5, verbose=True, chunked=False, output_rate=None, channels=(0,),
+                       power_window=50, method='rms', hop=0.25, timestamps=False):
+    """
+    Stream Muse EEG data and yield only the beta/theta ratio.
+    Yields a single value: beta_theta_ratio (or (timestamp, beta_theta_ratio) with timestamps=True)
+    Args:
+        duration (float): Unused since band power became a running estimate; kept for compatibility
+        verbose (bool): Print status messages
+        chunked (bool): Pull and process samples in chunks (see stream_muse_ratio_chunks)
+        output_rate (float): Ratios per second to yield in chunked mode, None for every sample
+        channels (tuple): Stream channel indices to combine (default TP9 only), None for all Muse channels
+        power_window (int): RMS band-power window in samples
+        method (str): 'rms' for filtered per-sample RMS, 'welch' for one FFT estimate per hop
+            (see stream_muse_welch_ratios)
+        hop (float): Seconds between ratios in 'welch' mode
+        timestamps (bool): Yield (timestamp, ratio) pairs with the LSL (or replay) timestamp of the
+            sample each ratio ends at, e.g. for EEGHub
+    """
+    if method == 'welch':
+        for timestamp, _, ratio in stream_muse_welch_ratios(hop=hop, channels=channels, verbose=verbose):
+            yield (timestamp, ratio) if timestamps else ratio
+        return
+    if chunked:
+        for chunk_timestamps, ratios in stream_muse_ratio_chunks(output_rate=output_rate, channels=channels,
+                                                                 power_window=power_window, verbose=verbose):
+            if timestamps:
+                yield from zip(chunk_timestamps.tolist(), ratios.tolist())
+            else:
+                yield from ratios
+        return
+
+    inlet, srate = connect_eeg_stream(verbose)
+    channel_idx = _channel_indices(channels)
+    BAND_RANGES = [(13, 30), (4, 8)]  # Beta, Theta
+    filter_bank = StreamingFilterBank(srate, BAND_RANGES, order=4)
+    # Running RMS over the last power_window samples for each band x channel
+    band_power = RunningBandPower(power_window, n_channels=(len(BAND_RANGES), len(channel_idx)))
     
+    sample_count = 0
     while True:
+        sample_count += 1
+        timed = sample_count % SAMPLE_TIMING_STRIDE == 0
+        if timed:
+            pull_start = time.perf_counter_ns()
         sample, timestamp = inlet.pull_sample(timeout=0.1)
+        if timed:
+            filter_start = time.perf_counter_ns()
+            _pull_stage.record(filter_start - pull_start)
         if sample:
-            # Roll buffers
-            raw_buffer = np.roll(raw_buffer, -1)
-            for i in range(len(band_buffers)):
-                band_buffers[i] = np.roll(band_buffers[i], -1)
-            # Update raw data buffer with first channel (e.g., TP9)
-            raw_buffer[-1] = sample[0]
             try:
-                # Process each frequency band
-                for idx, (low_freq, high_freq) in enumerate(BAND_RANGES):
-                    data_to_filter = raw_buffer.copy()
-                    DataFilter.detrend(data_to_filter, DetrendOperations.CONSTANT.value)
-                    DataFilter.perform_bandpass(data_to_filter, int(srate), low_freq, high_freq, 4, FilterTypes.BUTTERWORTH.value, 0)
-                    band_buffers[idx][-1] = data_to_filter[-1]
-                # Calculate beta/theta ratio using the most recent data (last 50 samples)
-                beta_power = calculate_band_power(band_buffers[1][-50:])
-                theta_power = calculate_band_power(band_buffers[2][-50:])
-                beta_theta_ratio = beta_power / (theta_power + 1e-10)
+                # Filter the selected channels through every band, keeping filter state between samples
+                filtered = filter_bank.filter_sample(np.asarray(sample)[channel_idx])
+                if timed:
+                    power_start = time.perf_counter_ns()
+                    _filter_stage.record(power_start - filter_start)
+                # Update the beta/theta band power over the most recent data (last power_window samples)
+                beta_power, theta_power = band_power.update(filtered)
+                _, beta_theta_ratio = _beta_theta_ratios(beta_power, theta_power)
+                if timed:
+                    _power_stage.record_since(power_start)
                 
                 # Check for NaN values and return focused status
                 if np.isnan(beta_theta_ratio):
                     if verbose:
                         print("NaN detected in stream data - returning focused status")
                     # Return a default focused value (you can adjust these values)
-                    yield 1.0  # Default focused ratio
-                else:
-                    yield beta_theta_ratio
+                    beta_theta_ratio = 1.0  # Default focused ratio
             except Exception as e:
                 if verbose:
                     print(f"Filtering error: {e}")
                 # Return focused status on error
-                yield 1.0
+                beta_theta_ratio = 1.0
+            yield (timestamp, beta_theta_ratio) if timestamps else beta_theta_ratio
         else:
+            if getattr(inlet, 'finished', False):
+                return  # end of a replayed recording
+            if verbose:
+                print("No data received - Check connection", end='\r')
+            time.sleep(0.1)
+
+def stream_muse_channel_ratios(output_rate=None, max_chunk=256, channels=None, verbose=True,
+                               power_window=50):
+    """
+    Stream Muse EEG data in chunks and yield per-channel and combined beta/theta ratios.
+    Each pull takes every sample available (up to max_chunk); all selected
+    channels are filtered as one (channels x time) array and their band power
+    is computed in the same vectorized pass.
+    Args:
+        output_rate (float): Ratios per second to yield, None for one per EEG sample
+        max_chunk (int): Maximum samples pulled per chunk
+        channels (list): Stream channel indices to process, None for all Muse channels
+        verbose (bool): Print status messages
+        power_window (int): RMS band-power window in samples
+    Yields:
+        tuple: (timestamps, channel_ratios, combined_ratios) with shapes (n,), (n_channels, n) and (n,):
+        the LSL timestamp of each ratio's sample and the ratios; n may be 0 when decimating
+    """
+    inlet, srate = connect_eeg_stream(verbose)
+    channel_idx = _channel_indices(channels)
+    reader = ChunkReader(inlet, max_samples=max_chunk)
+    BAND_RANGES = [(13, 30), (4, 8)]  # Beta, Theta
+    filter_bank = StreamingFilterBank(srate, BAND_RANGES, order=4)
+    # Running RMS over the last power_window samples for each band x channel
+    band_power = RunningBandPower(power_window, n_channels=(len(BAND_RANGES), len(channel_idx)))
+    # Keep every `decimation`-th ratio; `phase` is the index of the next one to keep
+    decimation = max(1, int(round(srate / output_rate))) if output_rate else 1
+    phase = 0
+
+    while True:
+        pull_start = time.perf_counter_ns()
+        chunk, timestamps = reader.read(timeout=0.1)
+        _pull_stage.record_since(pull_start)
+        n = len(timestamps)
+        if n == 0:
+            if getattr(inlet, 'finished', False):
+                return  # end of a replayed recording
             if verbose:
                 print("No data received - Check connection", end='\r')
             time.sleep(0.1)
+            continue
+        keep = np.arange(phase, n, decimation)
+        phase = (phase - n) % decimation
+        try:
+            # Filter all selected channels of the whole chunk at once
+            filter_start = time.perf_counter_ns()
+            filtered = filter_bank.filter_chunk(chunk[:, channel_idx].T)
+            power_start = time.perf_counter_ns()
+            _filter_stage.record(power_start - filter_start)
+            # Band power for every new sample and channel, each over its last power_window samples
+            beta_power, theta_power = band_power.update_chunk(filtered)[..., keep]
+            channel_ratios, combined_ratios = _beta_theta_ratios(beta_power, theta_power)
+            _power_stage.record_since(power_start)
+            # Replace NaN values with a default focused ratio
+            if verbose and np.isnan(combined_ratios).any():
+                print("NaN detected in stream data - returning focused status")
+            yield (timestamps[keep], np.where(np.isnan(channel_ratios), 1.0, channel_ratios),
+                   np.where(np.isnan(combined_ratios), 1.0, combined_ratios))
+        except Exception as e:
+            if verbose:
+                print(f"Filtering error: {e}")
+            # Return focused status on error
+            yield timestamps[keep], np.ones((len(channel_idx), len(keep))), np.ones(len(keep))
+
+def stream_muse_ratio_chunks(output_rate=None, max_chunk=256, channels=(0,), verbose=True,
+                             power_window=50):
+    """
+    Stream Muse EEG data in chunks and yield beta/theta ratios in batches.
+    Args:
+        output_rate (float): Ratios per second to yield, None for one per EEG sample
+        max_chunk (int): Maximum samples pulled per chunk
+        channels (tuple): Stream channel indices to combine (default TP9 only), None for all Muse channels
+        verbose (bool): Print status messages
+        power_window (int): RMS band-power window in samples
+    Yields:
+        tuple: (timestamps, ratios) np.ndarrays for the chunk (may be empty when decimating)
+    """
+    for timestamps, _, combined_ratios in stream_muse_channel_ratios(output_rate, max_chunk, channels=channels,
+                                                                     verbose=verbose, power_window=power_window):
+        yield timestamps, combined_ratios
+
+def stream_muse_welch_ratios(hop=0.25, window_seconds=2.0, max_chunk=256, channels=(0,), verbose=True):
+    """
+    Stream Muse EEG data and yield beta/theta ratios from a Welch PSD once per hop.
+    No band-pass filtering is done: beta and theta power both come from the
+    same spectrum of the last window_seconds of raw data, computed only every
+    `hop` seconds. Ratios use RMS amplitudes, like the 'rms' pipeline. A chunk
+    spanning several hops (e.g. an LSL backlog) yields one ratio per hop.
+    Args:
+        hop (float): Seconds between ratio estimates
+        window_seconds (float): Seconds of raw data each PSD is estimated from
+        max_chunk (int): Maximum samples pulled per chunk
+        channels (tuple): Stream channel indices to combine (default TP9 only), None for all Muse channels
+        verbose (bool): Print status messages
+    Yields:
+        tuple: (timestamp, channel_ratios, combined_ratio): the LSL timestamp of the last sample
+        of the hop, and ratios with shapes (n_channels,) and ()
+    """
+    inlet, srate = connect_eeg_stream(verbose)
+    channel_idx = _channel_indices(channels)
+    reader = ChunkReader(inlet, max_samples=max_chunk)
+    BAND_RANGES = [(13, 30), (4, 8)]  # Beta, Theta
+    band_power = WelchBandPower(srate, BAND_RANGES, window_seconds=window_seconds, hop_seconds=hop,
+                                n_channels=len(channel_idx))
+
+    while True:
+        pull_start = time.perf_counter_ns()
+        chunk, timestamps = reader.read(timeout=0.1)
+        _pull_stage.record_since(pull_start)
+        if len(timestamps) == 0:
+            if getattr(inlet, 'finished', False):
+                return  # end of a replayed recording
+            if verbose:
+                print("No data received - Check connection", end='\r')
+            time.sleep(0.1)
+            continue
+        try:
+            welch_start = time.perf_counter_ns()
+            ends, powers = band_power.update_chunk_hops(chunk[:, channel_idx].T)
+            _welch_stage.record_since(welch_start)
+            results = []
+            for end, (beta_power, theta_power) in zip(ends, powers):
+                channel_ratios, combined_ratio = _beta_theta_ratios(beta_power, theta_power)
+                # Replace NaN values with a default focused ratio
+                if np.isnan(combined_ratio):
+                    if verbose:
+                        print("NaN detected in stream data - returning focused status")
+                    combined_ratio = 1.0
+                results.append((float(timestamps[end]), np.where(np.isnan(channel_ratios), 1.0, channel_ratios),
+                                float(combined_ratio)))
+        except Exception as e:
+            if verbose:
+                print(f"Filtering error: {e}")
+            # Return focused status on error
+            results = [(float(timestamps[-1]), np.ones(len(channel_idx)), 1.0)]
+        yield from results
 
-def record_ratios_to_df(record_time, start_time=0, verbose=True):
+def record_ratios_to_df(record_time, start_time=0, verbose=True, hub=None):
     """
     Record streamed ratio data into a pandas DataFrame.
     Args:
         record_time (float): Duration in seconds to record data.
         start_time (float): Time in seconds from program start to begin recording.
         verbose (bool): Print status messages.
+        hub (EEGHub): Shared acquisition hub to subscribe to; opens a private stream if None.
     Returns:
         pd.DataFrame: DataFrame with columns ['timestamp', 'beta_theta_ratio']
     """
@@ -91,12 +356,21 @@ def record_ratios_to_df(record_time, start_time=0, verbose=True):
         time.sleep(0.05)
     if verbose:
         print(f"Starting recording for {record_time} seconds...")
-    gen = stream_muse_ratios(verbose=verbose)
+    if hub is not None:
+        subscription = hub.subscribe(maxsize=8192, name='recorder')
+        gen = (ratio for _, ratio in subscription)
+    else:
+        subscription = None
+        gen = stream_muse_ratios(verbose=verbose)
     record_start = time.time()
     while time.time() - record_start < record_time:
-        ratio = next(gen)
+        ratio = next(gen, None)
+        if ratio is None:  # hub stopped
+            break
         now = time.time() - start_program  # relative timestamp
         data.append([now, ratio])
+    if subscription is not None:
+        subscription.close()
     if verbose:
         print(f"Recording complete. Collected {len(data)} samples.")
     df = pd.DataFrame(data, columns=['timestamp', 'beta_theta_ratio'])
@@ -124,6 +398,9 @@ def get_focus_status():
     This function can be called from other parts of the application.
     Returns:
         str: Current focus status ('unknown', 'focused', 'out_of_focus', 'transitioning')
+    Note:
+        To react to changes without polling, use focus_events.subscribe(),
+        focus_events.subscribe_queue() or `async for event in focus_events.events()`.
     """
     # This will be updated by the main function
     global focus_status
@@ -132,6 +409,8 @@ def get_focus_status():
 def sliding_window_analysis(data_buffer, thresholds, window_size=10, sample_rate=256):
     """
     Analyze the sliding window for focus status changes.
+    This rescans the whole buffer; FocusDetector gives the same decision
+    incrementally in O(1) per ratio.
     Args:
         data_buffer: Deque containing (timestamp, ratio) tuples
         thresholds: Dictionary with threshold values including focus and unfocus thresholds
@@ -143,9 +422,9 @@ def sliding_window_analysis(data_buffer, thresholds, window_size=10, sample_rate
     if len(data_buffer) < window_size * sample_rate * 0.1:  # Need at least 10% of window
         return {'focus_status': 'unknown', 'details': 'Insufficient data'}
     
-    # Get the last window_size seconds of data
-    window_samples = int(window_size * sample_rate * 0.1)  # Assuming 10Hz ratio calculation
-    recent_data = list(data_buffer)[-window_samples:]
+    # Get the last window_size seconds of data by timestamp (ratios arrive at up to sample_rate Hz)
+    newest_time = data_buffer[-1][0]
+    recent_data = [item for item in data_buffer if item[0] >= newest_time - window_size]
     
     if len(recent_data) == 0:
         return {'focus_status': 'unknown', 'details': 'No recent data'}
@@ -194,13 +473,15 @@ def sliding_window_analysis(data_buffer, thresholds, window_size=10, sample_rate
         'details': details
     }
 
-def main(record_duration=30, record_start_time=2, continue_plotting=True):
+def main(record_duration=30, record_start_time=2, continue_plotting=True, hub=None):
     """
     Main function with simultaneous recording, plotting, and sliding window analysis.
+    Recording and plotting share one EEG hub, i.e. one inlet and one DSP pipeline.
     Args:
         record_duration (float): Duration in seconds to record data
         record_start_time (float): Time in seconds from program start to begin recording
         continue_plotting (bool): Whether to continue plotting after recording is complete
+        hub (EEGHub): Shared acquisition hub; a private one is started (and stopped) if None
     Returns:
         dict: Dictionary with mean values for the channel, or None if no recording was done
     """
@@ -208,14 +489,14 @@ def main(record_duration=30, record_start_time=2, continue_plotting=True):
     duration = 5  # seconds of buffer for plotting
     buffer_len = int(duration * 256)  # Default srate
     times = np.linspace(-duration, 0, buffer_len)
-    ratio_buffer = np.zeros(buffer_len)
+    ratio_buffer = RingBuffer(buffer_len)
 
     plt.ion()
     fig, ax = plt.subplots(1, 1, figsize=(12, 4))  # Single plot for better performance
     fig.suptitle('Muse EEG Focus Monitoring - Beta/Theta Ratio with Dual Thresholds', fontsize=16)
 
     # Main ratio plot
-    line, = ax.plot(times, ratio_buffer, label='Beta/Theta Ratio', color='blue')
+    line, = ax.plot(times, ratio_buffer.last(), label='Beta/Theta Ratio', color='blue')
     
     # Pre-allocate threshold lines with proper initial data
     threshold_line1, = ax.plot(times, np.zeros_like(times), color='red', linestyle='--', alpha=0.7, label='Unfocus Threshold (0.6x)')
@@ -235,16 +516,16 @@ def main(record_duration=30, record_start_time=2, continue_plotting=True):
     recording_means = None
     thresholds = None
     
-    # Sliding window data
-    sliding_window_data = deque(maxlen=2560)  # 10 seconds at 256Hz
+    # Sliding window focus detector (running statistics, O(1) per ratio)
+    detector = FocusDetector(window_size=10)
     global focus_status
     focus_status = 'unknown'  # 'unknown', 'focused', 'out_of_focus', 'transitioning'
-    last_analysis_time = 0
+    focus_events.publish(focus_status)
     last_plot_update_time = 0
+    ratio_count = 0
     
     # Performance optimization flags - MUCH less frequent updates
     plot_update_interval = 0.5  # Update plot every 500ms instead of 100ms
-    analysis_interval = 5.0     # Analysis every 5 seconds
     background_color_changed = False
     
     def record_data():
@@ -252,68 +533,101 @@ def main(record_duration=30, record_start_time=2, continue_plotting=True):
         nonlocal recorded_data, recording_means, thresholds
         print(f"Recording {record_duration} seconds of data (starting at {record_start_time}s)...")
         
-        # Wait until start time
-        start_program = time.time()
-        while time.time() - start_program < record_start_time:
-            time.sleep(0.05)
-        
-        # Start recording
-        record_start = time.time()
-        gen = stream_muse_ratios(verbose=False)
+        # Record from the shared hub; start and duration are measured in stream time
+        # (seconds since its first sample), so a replay calibrates on the same data at any speed
+        first_timestamp = None
         
-        while time.time() - record_start < record_duration:
+        while True:
             try:
-                ratio = next(gen)
+                try:
+                    item = calibration.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                if item is None:  # hub stopped
+                    break
+                timestamp, ratio = item
+                if first_timestamp is None:
+                    first_timestamp = timestamp
+                now = timestamp - first_timestamp
+                if now < record_start_time:
+                    continue  # wait until start time
+                if now >= record_start_time + record_duration:
+                    break
                 # Check for NaN values and skip them during recording
                 if np.isnan(ratio):
                     print("NaN detected during recording - skipping sample")
                     continue
-                now = time.time() - start_program
                 recorded_data.append([now, ratio])
             except Exception as e:
                 print(f"Recording error: {e}")
                 break
         
-        recording_complete.set()
+        calibration.close()
         print(f"Recording complete. Collected {len(recorded_data)} samples.")
         
-        # Calculate and print means
-        if recorded_data:
-            df = pd.DataFrame(recorded_data, columns=['timestamp', 'beta_theta_ratio'])
-            recording_means = get_channel_means(df)
-            print(f"\nRecording Results:")
-            print(f"Beta/Theta ratio mean: {recording_means['beta_theta_ratio']:.4f}")
-            print(f"Total samples recorded: {len(df)}")
-
-            thresholds = {
-                'beta_theta_ratio_unfocus': recording_means['beta_theta_ratio'] * 0.6,
-                'beta_theta_ratio_focus': recording_means['beta_theta_ratio'] * 0.85
-            }
-            print(f"Unfocus threshold (0.6x): Beta/Theta: {thresholds['beta_theta_ratio_unfocus']:.4f}")
-            print(f"Focus threshold (0.85x): Beta/Theta: {thresholds['beta_theta_ratio_focus']:.4f}")
-            
-            # Update threshold lines once when calculated
-            if thresholds is not None:
-                threshold_line1.set_data(times, thresholds['beta_theta_ratio_unfocus'] * np.ones_like(times))
-                threshold_line2.set_data(times, thresholds['beta_theta_ratio_focus'] * np.ones_like(times))
+        try:
+            # Calculate and print means
+            if recorded_data:
+                df = pd.DataFrame(recorded_data, columns=['timestamp', 'beta_theta_ratio'])
+                recording_means = get_channel_means(df)
+                print(f"\nRecording Results:")
+                print(f"Beta/Theta ratio mean: {recording_means['beta_theta_ratio']:.4f}")
+                print(f"Total samples recorded: {len(df)}")
 
+                thresholds = {
+                    'beta_theta_ratio_unfocus': recording_means['beta_theta_ratio'] * 0.6,
+                    'beta_theta_ratio_focus': recording_means['beta_theta_ratio'] * 0.85
+                }
+                print(f"Unfocus threshold (0.6x): Beta/Theta: {thresholds['beta_theta_ratio_unfocus']:.4f}")
+                print(f"Focus threshold (0.85x): Beta/Theta: {thresholds['beta_theta_ratio_focus']:.4f}")
+        finally:
+            # The live loop applies the thresholds (see calibration_pending)
+            recording_complete.set()
+
+    # One inlet and one DSP pipeline shared by the recorder and the live plot.
+    # Subscribe before the hub starts, so both see the stream from its first sample.
+    owns_hub = hub is None
+    if owns_hub:
+        # Chunked pulls keep the acquisition thread off the GIL between LSL packets (same ratios as per sample)
+        hub = EEGHub(ratio_source or (lambda: stream_muse_ratios(verbose=False, chunked=True, channels=CHANNELS,
+                                                                 timestamps=True)),
+                     lossless=lossless_hub)
+    live = hub.subscribe(name='live plot')
+    if record_duration > 0:
+        calibration = hub.subscribe(maxsize=8192, name='calibration')
+    if owns_hub:
+        hub.start()
+    
     # Start recording thread if duration > 0
     if record_duration > 0:
         record_thread = threading.Thread(target=record_data)
         record_thread.start()
+    # Thresholds take effect when the live stream reaches the end of the calibration
+    # (in stream time), so the detector sees the same ratios with them at any replay speed
+    calibration_pending = record_duration > 0
+    first_timestamp = None
     
     # Live plotting with sliding window analysis
-    gen = stream_muse_ratios(verbose=False)
-    
     try:
-        for ratio in gen:
+        for timestamp, ratio in live:
             current_time = time.time()
+            if first_timestamp is None:
+                first_timestamp = timestamp
+            if calibration_pending and timestamp - first_timestamp >= record_start_time + record_duration:
+                recording_complete.wait()
+                calibration_pending = False
+                if thresholds is not None:
+                    detector.set_thresholds(thresholds)
+                    # Update threshold lines once when calculated
+                    threshold_line1.set_data(times, thresholds['beta_theta_ratio_unfocus'] * np.ones_like(times))
+                    threshold_line2.set_data(times, thresholds['beta_theta_ratio_focus'] * np.ones_like(times))
             
             # Check for NaN values in the stream data
             if np.isnan(ratio):
                 # Set focus status to focused when NaN is detected
                 if focus_status != 'focused':
                     focus_status = 'focused'
+                    focus_events.publish(focus_status, {'reason': 'NaN detected in stream data'}, timestamp)
                     print(f"\n✅ FOCUSED STATUS (NaN detected) at {current_time:.1f}s")
                     # Visual feedback: Green background
                     ax.set_facecolor('lightgreen')
@@ -321,65 +635,67 @@ def main(record_duration=30, record_start_time=2, continue_plotting=True):
                 # Skip adding NaN data to the buffer
                 continue
             
-            # Add data to sliding window
-            sliding_window_data.append((current_time, ratio))
-            
-            # Roll buffers and update
-            ratio_buffer = np.roll(ratio_buffer, -1)
-            ratio_buffer[-1] = ratio
+            # Append to the ring buffer and update
+            ratio_buffer.append(ratio)
             
             # Update plot line (lightweight operation)
-            line.set_ydata(ratio_buffer)
+            line.set_ydata(ratio_buffer.last())
             
-            # Sliding window analysis (heavy operation - only every 5 seconds)
-            if current_time - last_analysis_time >= analysis_interval and thresholds is not None:
-                analysis_result = sliding_window_analysis(sliding_window_data, thresholds)
-                new_focus_status = analysis_result['focus_status']
-                
-                # Only print messages when status actually changes
-                if new_focus_status != focus_status:
-                    if new_focus_status == 'out_of_focus':
-                        focus_status = 'out_of_focus'
-                        details = analysis_result['details']
-                        print(f"\n🚨 OUT OF FOCUS DETECTED at {current_time:.1f}s")
-                        print(f"   Beta/Theta: {details['window_mean_ratio']:.4f} (unfocus threshold: {details['ratio_unfocus_threshold']:.4f})")
-                        print(f"   Ratio out of focus: {details['ratio_out_of_focus']}")
-                        
-                        # Visual feedback: Red background
-                        ax.set_facecolor('lightcoral')
-                        background_color_changed = True
-                        
-                    elif new_focus_status == 'focused':
-                        focus_status = 'focused'
-                        details = analysis_result['details']
-                        print(f"\n✅ BACK TO FOCUS at {current_time:.1f}s")
-                        print(f"   Beta/Theta: {details['window_mean_ratio']:.4f} (focus threshold: {details['ratio_focus_threshold']:.4f})")
-                        print(f"   Ratio back to focus: {details['ratio_back_to_focus']}")
-                        
-                        # Visual feedback: Green background
-                        ax.set_facecolor('lightgreen')
-                        background_color_changed = True
-                        
-                    elif new_focus_status == 'transitioning':
-                        focus_status = 'transitioning'
-                        details = analysis_result['details']
-                        print(f"\n🔄 TRANSITIONING at {current_time:.1f}s")
-                        print(f"   Beta/Theta: {details['window_mean_ratio']:.4f} (between thresholds)")
-                        
-                        # Visual feedback: Yellow background
-                        ax.set_facecolor('lightyellow')
-                        background_color_changed = True
-                        
-                    elif new_focus_status == 'unknown':
-                        focus_status = 'unknown'
-                        print(f"\n❓ UNKNOWN FOCUS STATUS at {current_time:.1f}s - insufficient data")
-                        
-                        # Reset background color
-                        if background_color_changed:
-                            ax.set_facecolor('white')
-                            background_color_changed = False
+            # Sliding window analysis on every ratio (incremental, O(1)); timed every few ratios
+            ratio_count += 1
+            timed = ratio_count % SAMPLE_TIMING_STRIDE == 0
+            if timed:
+                detector_start = time.perf_counter_ns()
+            new_focus_status = detector.update(timestamp, ratio)
+            if timed:
+                _detector_stage.record_since(detector_start)
+            
+            # Only print messages when status actually changes
+            if new_focus_status != focus_status:
+                analysis_result = detector.analysis()
+                if new_focus_status == 'out_of_focus':
+                    focus_status = 'out_of_focus'
+                    details = analysis_result['details']
+                    print(f"\n🚨 OUT OF FOCUS DETECTED at {current_time:.1f}s")
+                    print(f"   Beta/Theta: {details['window_mean_ratio']:.4f} (unfocus threshold: {details['ratio_unfocus_threshold']:.4f})")
+                    print(f"   Ratio out of focus: {details['ratio_out_of_focus']}")
+                    
+                    # Visual feedback: Red background
+                    ax.set_facecolor('lightcoral')
+                    background_color_changed = True
+                    
+                elif new_focus_status == 'focused':
+                    focus_status = 'focused'
+                    details = analysis_result['details']
+                    print(f"\n✅ BACK TO FOCUS at {current_time:.1f}s")
+                    print(f"   Beta/Theta: {details['window_mean_ratio']:.4f} (focus threshold: {details['ratio_focus_threshold']:.4f})")
+                    print(f"   Ratio back to focus: {details['ratio_back_to_focus']}")
+                    
+                    # Visual feedback: Green background
+                    ax.set_facecolor('lightgreen')
+                    background_color_changed = True
+                    
+                elif new_focus_status == 'transitioning':
+                    focus_status = 'transitioning'
+                    details = analysis_result['details']
+                    print(f"\n🔄 TRANSITIONING at {current_time:.1f}s")
+                    print(f"   Beta/Theta: {details['window_mean_ratio']:.4f} (between thresholds)")
+                    
+                    # Visual feedback: Yellow background
+                    ax.set_facecolor('lightyellow')
+                    background_color_changed = True
+                    
+                elif new_focus_status == 'unknown':
+                    focus_status = 'unknown'
+                    print(f"\n❓ UNKNOWN FOCUS STATUS at {current_time:.1f}s - insufficient data")
+                    
+                    # Reset background color
+                    if background_color_changed:
+                        ax.set_facecolor('white')
+                        background_color_changed = False
                 
-                    last_analysis_time = current_time
+                # Push the transition to subscribers (video player, nudges, ...)
+                focus_events.publish(focus_status, analysis_result['details'], timestamp)
             
             # Heavy plot updates only every 500ms (much less frequent)
             if current_time - last_plot_update_time >= plot_update_interval:
@@ -388,8 +704,10 @@ def main(record_duration=30, record_start_time=2, continue_plotting=True):
                 ax.autoscale_view(scaley=True, scalex=False)
                 
                 # Flush events less frequently
+                draw_start = time.perf_counter_ns()
                 fig.canvas.draw()
                 fig.canvas.flush_events()
+                _plot_stage.record_since(draw_start)
                 last_plot_update_time = current_time
             
             # Check if recording is complete and we should stop
@@ -401,13 +719,16 @@ def main(record_duration=30, record_start_time=2, continue_plotting=True):
     except Exception as e:
         print(f"Plotting error: {e}")
     
+    live.close()
     # Wait for recording thread to complete if it's still running
     if record_duration > 0:
         record_thread.join()
+    if owns_hub:
+        hub.stop()
     
     return recording_means
 
-def start_focus_monitoring(record_duration=30, record_start_time=2, continue_plotting=True):
+def start_focus_monitoring(record_duration=30, record_start_time=2, continue_plotting=True, hub=None):
     """
     Start the focus monitoring system with the new dual-threshold approach.
     
@@ -415,6 +736,7 @@ def start_focus_monitoring(record_duration=30, record_start_time=2, continue_plo
         record_duration (float): Duration in seconds to record baseline data
         record_start_time (float): Time in seconds from program start to begin recording
         continue_plotting (bool): Whether to continue plotting after recording is complete
+        hub (EEGHub): Shared acquisition hub; a private one is used if None
     
     Returns:
         dict: Dictionary with baseline mean values for the channel, or None if no recording was done
@@ -425,7 +747,14 @@ def start_focus_monitoring(record_duration=30, record_start_time=2, continue_plo
     - If ratio is between thresholds -> 'transitioning'
     - If insufficient data -> 'unknown'
     """
-    return main(record_duration, record_start_time, continue_plotting)
+    return main(record_duration, record_start_time, continue_plotting, hub=hub)
+
+if os.environ.get('HYPERFOCUS_REPLAY') == 'synthetic':
+    use_synthetic(speed=float(os.environ.get('HYPERFOCUS_REPLAY_SPEED', 1.0)))
+elif os.environ.get('HYPERFOCUS_REPLAY'):
+    use_replay(os.environ['HYPERFOCUS_REPLAY'], speed=float(os.environ.get('HYPERFOCUS_REPLAY_SPEED', 1.0)))
 
 if __name__ == "__main__":
+    install_signal_dump()
     main()
+    dump_latencies("EEG pipeline stage latencies")
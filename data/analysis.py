@@ -4,12 +4,61 @@ import sys
 import os
 from datetime import datetime, timedelta
 
+RATIO_COLUMNS = ['beta_theta_ratio', 'beta_alpha_theta_ratio']
+WINDOW_STATS = ['mean', 'std', 'median', 'min', 'max']
+
+
+def _parse_start_time(start_time):
+    """Seconds from the start of the recording for 'HH:MM:SS' or a number of seconds."""
+    if isinstance(start_time, str) and ':' in start_time:  # If time format is HH:MM:SS
+        h, m, s = map(float, start_time.split(':'))
+        return h * 3600 + m * 60 + s
+    return float(start_time)
+
+
+def load_muse_recording(filename):
+    """
+    Read a Muse recording CSV file once, for analyze_muse_recording / analyze_windows.
+    Older recordings name the time column 'timestamp'; it is renamed to 'lsl_timestamp'.
+    
+    Args:
+        filename (str): Path to the Muse recording CSV file (looked up next to this script)
+        
+    Returns:
+        pd.DataFrame: The recording with a float 'lsl_timestamp' column
+    """
+    # Get the directory where this script is located
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    # Construct the full path to the CSV file
+    full_path = os.path.join(script_dir, os.path.basename(filename))
+    
+    # Check if file exists
+    if not os.path.exists(full_path):
+        raise FileNotFoundError(f"File not found: {full_path}")
+        
+    # Read the CSV file (the ISO text column is not needed for analysis)
+    df = pd.read_csv(full_path, usecols=lambda column: column != 'iso_timestamp')
+    if 'lsl_timestamp' not in df.columns and 'timestamp' in df.columns:
+        df = df.rename(columns={'timestamp': 'lsl_timestamp'})
+    
+    # Check if required columns exist
+    required_columns = RATIO_COLUMNS + ['lsl_timestamp']
+    missing_columns = [col for col in required_columns if col not in df.columns]
+    if missing_columns:
+        raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
+
+    # Convert lsl_timestamp column to float timestamps
+    df['lsl_timestamp'] = df['lsl_timestamp'].astype(float)
+    return df
+
+
 def analyze_muse_recording(filename, start_time=None, duration_seconds=None):
     """
     Analyze a Muse recording CSV file and return basic statistics.
     
     Args:
-        filename (str): Path to the Muse recording CSV file
+        filename (str or pd.DataFrame): Path to the Muse recording CSV file, or a
+            recording already loaded with load_muse_recording
         start_time (str, optional): Start time in format 'HH:MM:SS' or seconds from start
         duration_seconds (float, optional): Duration of the window to analyze in seconds
         
@@ -17,38 +66,14 @@ def analyze_muse_recording(filename, start_time=None, duration_seconds=None):
         dict: Dictionary containing statistics for beta/theta and beta/(alpha+theta) ratios
     """
     try:
-        # Get the directory where this script is located
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        # Construct the full path to the CSV file
-        full_path = os.path.join(script_dir, os.path.basename(filename))
-        
-        # Check if file exists
-        if not os.path.exists(full_path):
-            raise FileNotFoundError(f"File not found: {full_path}")
-            
-        # Read the CSV file
-        df = pd.read_csv(full_path)
-        
-        # Check if required columns exist
-        required_columns = ['beta_theta_ratio', 'beta_alpha_theta_ratio', 'lsl_timestamp']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
-
-        # Convert lsl_timestamp column to float timestamps
-        df['lsl_timestamp'] = df['lsl_timestamp'].astype(float)
+        df = filename if isinstance(filename, pd.DataFrame) else load_muse_recording(filename)
         
         # Get the start timestamp (first row)
         initial_timestamp = df['lsl_timestamp'].iloc[0]
         
         # Apply time window filtering if specified
         if start_time is not None and duration_seconds is not None:
-            if isinstance(start_time, str) and ':' in start_time:  # If time format is HH:MM:SS
-                # Convert HH:MM:SS to seconds
-                h, m, s = map(float, start_time.split(':'))
-                start_seconds = h * 3600 + m * 60 + s
-            else:
-                start_seconds = float(start_time)
+            start_seconds = _parse_start_time(start_time)
             
             # Calculate target timestamps
             target_start = initial_timestamp + start_seconds
@@ -93,6 +118,62 @@ def analyze_muse_recording(filename, start_time=None, duration_seconds=None):
         print(f"Error analyzing file: {str(e)}")
         return None
 
+def analyze_windows(recording, window_seconds=30.0, step_seconds=None, start_time=None,
+                    duration_seconds=None, columns=RATIO_COLUMNS):
+    """
+    Statistics of every fixed or sliding time window of a recording in one pass.
+    
+    Windows start at multiples of step_seconds from the first sample and cover
+    [start, start + window_seconds), like analyze_muse_recording. Samples are
+    binned by time (a sample lies in up to ceil(window / step) sliding
+    windows) and all windows are aggregated with a single groupby.
+    
+    Args:
+        recording (str or pd.DataFrame): CSV file name, or a recording from load_muse_recording
+        window_seconds (float): Window length in seconds
+        step_seconds (float, optional): Seconds between window starts; None for
+            back-to-back (fixed) windows
+        start_time (str, optional): Only analyze from this time on ('HH:MM:SS' or seconds from start)
+        duration_seconds (float, optional): Only analyze this many seconds from start_time
+        columns (list): Ratio columns to summarize
+        
+    Returns:
+        pd.DataFrame: Tidy table with one row per window and ratio: window_start and
+        window_end (seconds from the start of the recording), ratio, n_samples,
+        mean, std, median, min, max. Windows without samples are left out.
+    """
+    df = recording if isinstance(recording, pd.DataFrame) else load_muse_recording(recording)
+    step = window_seconds if step_seconds is None else step_seconds
+    
+    offsets = df['lsl_timestamp'].to_numpy() - df['lsl_timestamp'].iloc[0]
+    values = df[list(columns)].to_numpy()
+    if start_time is not None:
+        start_seconds = _parse_start_time(start_time)
+        end_seconds = np.inf if duration_seconds is None else start_seconds + duration_seconds
+        keep = (offsets >= start_seconds) & (offsets < end_seconds)
+        offsets, values = offsets[keep], values[keep]
+    
+    # Window w covers [w * step, w * step + window); a sample at offset o is in
+    # windows floor(o / step) - j for j = 0 .. ceil(window / step) - 1 that still contain it
+    last_window = np.floor(offsets / step).astype(np.int64)
+    copies = int(np.ceil(window_seconds / step))
+    window_ids = (last_window[None, :] - np.arange(copies)[:, None]).ravel()
+    sample_idx = np.tile(np.arange(len(offsets)), copies)
+    inside = (window_ids >= 0) & (offsets[sample_idx] < window_ids * step + window_seconds)
+    window_ids, sample_idx = window_ids[inside], sample_idx[inside]
+    
+    windowed = pd.DataFrame(values[sample_idx], columns=list(columns))
+    windowed['window'] = window_ids
+    stats = windowed.groupby('window')[list(columns)].agg(['count'] + WINDOW_STATS)
+    
+    # Wide (window x (ratio, stat)) -> tidy (one row per window and ratio)
+    tidy = stats.stack(level=0).rename_axis(['window', 'ratio']).reset_index()
+    tidy = tidy.rename(columns={'count': 'n_samples'})
+    tidy.insert(1, 'window_start', tidy['window'] * step)
+    tidy.insert(2, 'window_end', tidy['window_start'] + window_seconds)
+    return tidy.drop(columns='window')[['window_start', 'window_end', 'ratio', 'n_samples'] + WINDOW_STATS]
+
+
 def print_stats(stats):
     """Pretty print the statistics"""
     if not stats:
@@ -147,12 +228,16 @@ def main():
             print_stats(stats_window)
 
 
-        # Example 3: Analyze every 30 seconds window
-        for start_time in range(0, 120, 30):
-            print(f"\nAnalyzing 30-second window starting at {start_time}:")
-            stats_window = analyze_muse_recording(filename, start_time=start_time, duration_seconds=30)
-            if stats_window:
-                print_stats(stats_window)
+        # Example 3: Analyze every 30-second window (file read once, all windows in one pass)
+        recording = load_muse_recording(filename)
+        print("\nAnalyzing every 30-second window:")
+        windows = analyze_windows(recording, window_seconds=30)
+        print(windows.to_string(index=False))
+
+        # Example 4: Sliding 30-second windows every 10 seconds
+        print("\nAnalyzing sliding 30-second windows every 10 seconds:")
+        windows = analyze_windows(recording, window_seconds=30, step_seconds=10)
+        print(windows[windows['ratio'] == 'beta_theta_ratio'].to_string(index=False))
 
                     
     except Exception as e:
@@ -0,0 +1,82 @@
+"""
+Streaming band-pass filter bank for Muse EEG data.
+
+Each band is a Butterworth band-pass stored as second-order sections (SOS).
+The filter state is carried between calls, so every new sample costs
+O(filter order) per band instead of re-filtering the whole buffer. A bank can
+filter one channel or several channels at once (channels x time).
+"""
+
+import numpy as np
+from scipy.signal import butter, sosfilt, sosfilt_zi
+
+
+class StreamingFilterBank:
+    """Bank of stateful Butterworth band-pass filters, one per frequency band."""
+
+    def __init__(self, srate, band_ranges, order=4):
+        """
+        Args:
+            srate (float): Sampling rate of the stream in Hz
+            band_ranges (list): List of (low, high) frequency ranges in Hz
+            order (int): Butterworth filter order (same meaning as brainflow's)
+        """
+        self.srate = float(srate)
+        self.band_ranges = list(band_ranges)
+        self.order = order
+        self.sos = [butter(order, [low, high], btype='bandpass', fs=self.srate, output='sos')
+                    for low, high in self.band_ranges]
+        # Steady-state response to a unit step, used to start without a transient
+        self._zi_step = [sosfilt_zi(sos) for sos in self.sos]
+        self.zi = None
+
+    def reset(self):
+        """Forget the filter state; the next sample re-initialises it."""
+        self.zi = None
+
+    def _init_state(self, first):
+        # Start every filter as if the signal had been constant at its first value.
+        # This replaces the constant detrend the batch pipeline did per window.
+        first = np.asarray(first, dtype=float)
+        if first.ndim == 0:
+            self.zi = [zi_step * first for zi_step in self._zi_step]
+        else:
+            # One state per channel: (n_sections, n_channels, 2)
+            self.zi = [zi_step[:, None, :] * first[:, None] for zi_step in self._zi_step]
+
+    def filter_sample(self, value):
+        """
+        Filter a single raw sample through every band.
+        Args:
+            value: Raw EEG sample, either a scalar or one value per channel
+        Returns:
+            np.ndarray: Filtered values of shape (n_bands,) or (n_bands, n_channels)
+        """
+        x = np.asarray(value, dtype=float)
+        if self.zi is None:
+            self._init_state(x)
+        x = x[..., None]
+        out = np.empty((len(self.sos),) + x.shape[:-1])
+        for idx, sos in enumerate(self.sos):
+            y, self.zi[idx] = sosfilt(sos, x, zi=self.zi[idx])
+            out[idx] = y[..., 0]
+        return out
+
+    def filter_chunk(self, values):
+        """
+        Filter a chunk of consecutive raw samples through every band in one call.
+        All channels of a 2-D chunk are filtered together in a single pass per band.
+        Args:
+            values (array-like): Raw EEG chunk, shape (n_samples,) or (n_channels, n_samples), oldest first
+        Returns:
+            np.ndarray: Filtered chunk of shape (n_bands, n_samples) or (n_bands, n_channels, n_samples)
+        """
+        x = np.asarray(values, dtype=float)
+        out = np.empty((len(self.sos),) + x.shape)
+        if x.shape[-1] == 0:
+            return out
+        if self.zi is None:
+            self._init_state(x[..., 0])
+        for idx, sos in enumerate(self.sos):
+            out[idx], self.zi[idx] = sosfilt(sos, x, axis=-1, zi=self.zi[idx])
+        return out
@@ -0,0 +1,161 @@
+"""
+Single-inlet EEG hub.
+
+One background thread owns the ratio source (one LSL inlet and one DSP
+pipeline) and publishes every (timestamp, ratio) pair to any number of
+subscribers through bounded queues. Timestamps come from the source (LSL or
+replay time), so window lengths mean the same at any replay speed.
+
+A live hub never waits for a slow subscriber: it drops that subscriber's
+oldest items. A lossless hub (for replays, which must give the same result
+at any speed) waits for room instead, so the slowest subscriber paces the
+source. Adding a consumer (calibration recorder,
+live plot, focus detector, CSV writer) costs a queue, not another pipeline.
+"""
+
+import queue
+import threading
+
+_STOP = object()  # pushed to every subscriber when the hub stops
+
+
+class Subscription:
+    """A subscriber's bounded queue of (timestamp, ratio) tuples."""
+
+    def __init__(self, hub, maxsize, name):
+        self.hub = hub
+        self.name = name
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0  # items discarded because this subscriber fell behind
+        self.closed = False
+
+    def _put(self, item, block=False):
+        if block:
+            # Lossless: wait for room, unless the subscriber or the hub goes away meanwhile
+            while not self.closed and not self.hub._stop_event.is_set():
+                try:
+                    self.queue.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+            return
+        # Never block the hub: when full, drop the oldest item to keep the newest
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        """
+        Wait for the next item.
+        Args:
+            timeout (float): Seconds to wait, None to wait forever
+        Returns:
+            tuple: (timestamp, ratio), or None once the hub has stopped
+        Raises:
+            queue.Empty: If nothing arrived within timeout
+        """
+        item = self.queue.get(timeout=timeout)
+        if item is _STOP:
+            # Leave the marker for any other reader of this subscription
+            self._put(_STOP)
+            return None
+        return item
+
+    def __iter__(self):
+        while True:
+            item = self.get()
+            if item is None:
+                return
+            yield item
+
+    def close(self):
+        """Stop receiving items."""
+        self.hub.unsubscribe(self)
+
+
+class EEGHub:
+    """Runs one ratio source in a thread and fans its output out to subscribers."""
+
+    def __init__(self, source_factory, name="EEG hub", lossless=False):
+        """
+        Args:
+            source_factory (callable): Returns a generator of (timestamp, ratio) pairs, e.g.
+                lambda: concentration.stream_muse_ratios(verbose=False, chunked=True, timestamps=True).
+                It is called in the hub thread, so the inlet is opened there.
+            name (str): Thread name
+            lossless (bool): Wait for full subscriber queues instead of dropping items
+                (for replays; a live stream would fall behind)
+        """
+        self.source_factory = source_factory
+        self.name = name
+        self.lossless = lossless
+        self._subscribers = ()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.error = None
+        self.published = 0
+
+    def subscribe(self, maxsize=1024, name=None):
+        """
+        Register a new consumer. It receives items published from now on.
+        Args:
+            maxsize (int): Queue bound; when full the oldest item is dropped
+            name (str): Label used in status messages
+        Returns:
+            Subscription
+        """
+        sub = Subscription(self, maxsize, name)
+        with self._lock:
+            self._subscribers = self._subscribers + (sub,)
+            if self._stop_event.is_set():
+                sub._put(_STOP)
+        return sub
+
+    def unsubscribe(self, sub):
+        """Remove a consumer; safe to call more than once."""
+        with self._lock:
+            self._subscribers = tuple(s for s in self._subscribers if s is not sub)
+        sub.closed = True
+
+    def start(self):
+        """Start the acquisition thread (once)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        """Ask the acquisition thread to stop and release every subscriber."""
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+        self._release_subscribers()
+
+    def _release_subscribers(self):
+        with self._lock:
+            for sub in self._subscribers:
+                sub._put(_STOP)
+
+    def _run(self):
+        try:
+            for item in self.source_factory():
+                if self._stop_event.is_set():
+                    break
+                # Tuple snapshot: subscribe/unsubscribe replace it, never mutate it
+                for sub in self._subscribers:
+                    sub._put(item, self.lossless)
+                self.published += 1
+        except Exception as e:
+            self.error = e
+            print(f"EEG hub error: {e}")
+        finally:
+            self._stop_event.set()
+            self._release_subscribers()
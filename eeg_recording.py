@@ -0,0 +1,290 @@
+"""
+Append-only binary recordings of Muse sessions.
+
+A recording is a small header followed by fixed-width little-endian records:
+
+    b'HFREC1\n' | uint32 header length | JSON header | record, record, ...
+
+The JSON header holds the sample rate, channel names and the column schema
+(name and NumPy dtype per column). Records are collected in a preallocated
+block and written with one write() per block, with a bounded flush interval
+so at most `flush_interval` seconds of data are lost if the process dies.
+export_recording() turns a recording into CSV or Parquet when needed.
+
+RawRecorder keeps the raw EEG samples of a session with their LSL timestamps
+in a growable, memory-mapped .npy file (plus a small .json with the stream
+metadata), so offline tools can open hour-long sessions instantly with
+open_raw_recording() and slice them without copying.
+"""
+
+import json
+import os
+import struct
+import time
+from datetime import datetime
+
+import numpy as np
+
+MAGIC = b'HFREC1\n'
+NPY_HEADER_LEN = 512  # fixed, so the shape can be rewritten in place as the file grows
+
+
+class BinaryRecorder:
+    """Buffered writer of fixed-width records with a self-describing header."""
+
+    def __init__(self, path, columns, srate=None, channel_names=None, block_records=1024,
+                 flush_interval=1.0, fsync=False):
+        """
+        Args:
+            path (str): Output file (created or truncated)
+            columns (list): (name, dtype) per column, e.g. [('lsl_timestamp', 'f8'), ('beta_theta_ratio', 'f4')]
+            srate (float): Nominal sample rate of the stream
+            channel_names (list): Names of the recorded EEG channels
+            block_records (int): Records buffered in memory between writes
+            flush_interval (float): Maximum seconds before buffered records reach the OS
+            fsync (bool): Also fsync on every flush (survives power loss, costs more)
+        """
+        self.path = path
+        self.dtype = np.dtype([(name, np.dtype(dtype).newbyteorder('<')) for name, dtype in columns])
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.records = 0
+        self._block = np.zeros(block_records, dtype=self.dtype)
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+        header = {
+            'srate': srate,
+            'channels': list(channel_names or []),
+            'columns': [[name, self.dtype[name].str] for name in self.dtype.names],
+            'created': datetime.now().isoformat(),
+        }
+        header_bytes = json.dumps(header).encode('utf-8')
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC + struct.pack('<I', len(header_bytes)) + header_bytes)
+        self._file.flush()
+
+    def append(self, *columns):
+        """
+        Append one chunk of records; every argument is one column in schema order.
+        Args:
+            *columns (array-like): Equal-length arrays (or scalars for a single record)
+        """
+        columns = [np.atleast_1d(column) for column in columns]
+        n = len(columns[0])
+        done = 0
+        while done < n:
+            take = min(n - done, len(self._block) - self._pending)
+            rows = self._block[self._pending:self._pending + take]
+            for name, column in zip(self.dtype.names, columns):
+                rows[name] = column[done:done + take]
+            self._pending += take
+            done += take
+            if self._pending == len(self._block):
+                self._write_block()
+        self.records += n
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def _write_block(self):
+        if self._pending:
+            self._file.write(self._block[:self._pending].tobytes())
+            self._pending = 0
+
+    def flush(self):
+        """Write buffered records and hand them to the OS."""
+        self._write_block()
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_header(f):
+    """Read the header of an open recording; returns (header dict, offset of the first record)."""
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not a hyperFocus binary recording")
+    (length,) = struct.unpack('<I', f.read(4))
+    header = json.loads(f.read(length).decode('utf-8'))
+    return header, len(MAGIC) + 4 + length
+
+
+def read_recording(path):
+    """
+    Load a binary recording.
+    A partially written last record (e.g. after a crash) is ignored.
+    Args:
+        path (str): Recording file
+    Returns:
+        tuple: (header dict, structured np.ndarray of records)
+    """
+    with open(path, 'rb') as f:
+        header, offset = read_header(f)
+    dtype = np.dtype([(name, dtype) for name, dtype in header['columns']])
+    count = (os.path.getsize(path) - offset) // dtype.itemsize
+    records = np.fromfile(path, dtype=dtype, count=count, offset=offset)
+    return header, records
+
+
+def export_recording(path, out_path, iso_timestamps=True):
+    """
+    Convert a binary recording to CSV or Parquet (chosen by the extension of out_path).
+    Args:
+        path (str): Binary recording
+        out_path (str): Output .csv or .parquet file
+        iso_timestamps (bool): Add an iso_timestamp column after lsl_timestamp,
+            like the CSV files written by the old recorder
+    Returns:
+        pandas.DataFrame: The exported data
+    Raises:
+        ImportError: For .parquet output when no Parquet engine (pyarrow) is installed
+    """
+    import pandas as pd
+
+    _, records = read_recording(path)
+    df = pd.DataFrame({name: records[name] for name in records.dtype.names})
+    if iso_timestamps and 'lsl_timestamp' in df.columns:
+        iso = [datetime.fromtimestamp(ts).isoformat() for ts in df['lsl_timestamp'].tolist()]
+        df.insert(df.columns.get_loc('lsl_timestamp') + 1, 'iso_timestamp', iso)
+
+    if out_path.endswith('.parquet'):
+        try:
+            df.to_parquet(out_path, index=False)
+        except ImportError as e:
+            raise ImportError("Parquet export needs pyarrow: pip install pyarrow (or export to .csv)") from e
+    else:
+        df.to_csv(out_path, index=False)
+    return df
+
+
+
+def _npy_header(dtype, length):
+    # .npy version 1.0 header padded to a fixed size
+    text = repr({'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False, 'shape': (length,)})
+    text = text.encode('latin1').ljust(NPY_HEADER_LEN - 10 - 1) + b'\n'
+    if len(text) != NPY_HEADER_LEN - 10:
+        raise ValueError("dtype description does not fit the .npy header")
+    return b'\x93NUMPY\x01\x00' + struct.pack('<H', len(text)) + text
+
+
+class RawRecorder:
+    """Raw multi-channel samples with LSL timestamps in a growable memory-mapped .npy file."""
+
+    def __init__(self, path, n_channels, srate=None, channel_names=None, dtype='f4',
+                 initial_capacity=256 * 60 * 10, flush_interval=1.0):
+        """
+        Args:
+            path (str): Output .npy file; metadata goes to the same name with .json
+            n_channels (int): Number of EEG channels recorded
+            srate (float): Nominal sample rate of the stream
+            channel_names (list): Names of the recorded channels
+            dtype (str): Sample dtype (LSL delivers float32 for Muse)
+            initial_capacity (int): Samples preallocated before the file first grows
+            flush_interval (float): Maximum seconds before written samples are flushed
+        """
+        self.path = path
+        self.dtype = np.dtype([('lsl_timestamp', '<f8'), ('eeg', np.dtype(dtype).newbyteorder('<'), (n_channels,))])
+        self.flush_interval = flush_interval
+        self.samples = 0
+        self._capacity = 0
+        self._map = None
+        self._last_flush = time.monotonic()
+
+        metadata = {
+            'srate': srate,
+            'channels': list(channel_names or []),
+            'created': datetime.now().isoformat(),
+        }
+        with open(os.path.splitext(path)[0] + '.json', 'w') as f:
+            json.dump(metadata, f)
+        with open(path, 'wb') as f:
+            f.write(_npy_header(self.dtype, 0))
+        self._grow(initial_capacity)
+
+    def _grow(self, capacity):
+        # Extend the file and map it again; the samples written so far stay where they are
+        if self._map is not None:
+            self._map.flush()
+            self._map = None
+        with open(self.path, 'r+b') as f:
+            f.truncate(NPY_HEADER_LEN + capacity * self.dtype.itemsize)
+        self._capacity = capacity
+        self._map = np.memmap(self.path, dtype=self.dtype, mode='r+', offset=NPY_HEADER_LEN, shape=(capacity,))
+
+    def append(self, timestamps, samples):
+        """
+        Args:
+            timestamps (np.ndarray): (n,) LSL timestamps
+            samples (np.ndarray): (n, channels) raw samples (extra columns are ignored)
+        """
+        n = len(timestamps)
+        if self.samples + n > self._capacity:
+            self._grow(max(2 * self._capacity, self.samples + n))
+        rows = self._map[self.samples:self.samples + n]
+        rows['lsl_timestamp'] = timestamps
+        rows['eeg'] = samples[:, :self.dtype['eeg'].shape[0]]
+        self.samples += n
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Flush the mapped samples and record the current length in the header."""
+        self._map.flush()
+        with open(self.path, 'r+b') as f:
+            f.write(_npy_header(self.dtype, self.samples))
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        """Flush and trim the preallocated tail, leaving a plain .npy file."""
+        if self._map is None:
+            return
+        self.flush()
+        self._map = None
+        with open(self.path, 'r+b') as f:
+            f.truncate(NPY_HEADER_LEN + self.samples * self.dtype.itemsize)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_raw_recording(path):
+    """
+    Open a raw recording without reading it into memory.
+    Args:
+        path (str): .npy file written by RawRecorder
+    Returns:
+        tuple: (metadata dict, read-only memmap with 'lsl_timestamp' and 'eeg' (n, channels) fields)
+    """
+    metadata = {}
+    metadata_path = os.path.splitext(path)[0] + '.json'
+    if os.path.exists(metadata_path):
+        with open(metadata_path) as f:
+            metadata = json.load(f)
+    return metadata, np.load(path, mmap_mode='r')
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3:
+        print("Usage: python eeg_recording.py <recording>.hfrec <output>.csv|.parquet")
+        sys.exit(1)
+    try:
+        exported = export_recording(sys.argv[1], sys.argv[2])
+    except ImportError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(f"Exported {len(exported)} records to {sys.argv[2]}")
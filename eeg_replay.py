@@ -0,0 +1,212 @@
+"""
+Offline replay of recorded sessions, so the pipeline can run without a headband.
+
+ReplayInlet serves a raw recording (RawRecorder .npy) through the parts of the
+pylsl StreamInlet interface the pipeline uses (info(), pull_sample(),
+pull_chunk()), releasing each sample when its original timestamp comes due.
+replay_ratios() does the same for recordings that only hold ratios (the
+data/*.csv files and .hfrec files), yielding (timestamp, ratio) pairs like
+stream_muse_ratios(timestamps=True).
+
+speed=1.0 replays in real time, speed=N at N times real time, and speed=None
+(or 0) as fast as the consumer reads. See concentration.use_replay() to route
+every entry point through a replay.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+from pylsl import cf_float32, cf_double64
+
+from eeg_recording import read_recording, open_raw_recording
+
+
+class ReplayStreamInfo:
+    """The StreamInfo getters the pipeline reads, for a replayed stream."""
+
+    def __init__(self, name, srate, n_channels, channel_format):
+        self._name = name
+        self._srate = srate
+        self._n_channels = n_channels
+        self._channel_format = channel_format
+
+    def name(self):
+        return self._name
+
+    def type(self):
+        return 'EEG'
+
+    def nominal_srate(self):
+        return self._srate
+
+    def channel_count(self):
+        return self._n_channels
+
+    def channel_format(self):
+        return self._channel_format
+
+
+class ReplayInlet:
+    """Stands in for a pylsl StreamInlet, serving recorded samples on their original schedule."""
+
+    def __init__(self, timestamps, samples, srate, speed=1.0, name='Replay'):
+        """
+        Args:
+            timestamps (np.ndarray): (n,) LSL timestamps of the samples
+            samples (np.ndarray): (n, channels) samples (a memmap is fine; rows are read lazily)
+            srate (float): Nominal sample rate
+            speed (float): Replay speed factor, None or 0 for as fast as possible
+            name (str): Stream name reported by info()
+        """
+        self.timestamps = np.asarray(timestamps, dtype=np.float64)
+        self.samples = samples
+        self.speed = speed
+        channel_format = cf_double64 if samples.dtype == np.float64 else cf_float32
+        self._info = ReplayStreamInfo(name, srate, samples.shape[1], channel_format)
+        # Seconds after the replay start at which each sample is released
+        self._offsets = (self.timestamps - self.timestamps[0]) / speed if speed else None
+        self._start = None
+        self._next = 0
+
+    def info(self, timeout=None):
+        return self._info
+
+    def open_stream(self, timeout=None):
+        pass
+
+    def close_stream(self):
+        pass
+
+    @property
+    def finished(self):
+        """True once every sample has been pulled."""
+        return self._next >= len(self.timestamps)
+
+    def _due(self):
+        # Index one past the last sample whose time has come
+        if self._start is None:
+            self._start = time.perf_counter()
+        if self._offsets is None:
+            return len(self.timestamps)
+        return int(np.searchsorted(self._offsets, time.perf_counter() - self._start, side='right'))
+
+    def _wait(self, timeout):
+        # Like LSL: wait up to timeout for at least one sample
+        due = self._due()
+        if due > self._next or self.finished or not timeout:
+            return due
+        delay = self._start + self._offsets[self._next] - time.perf_counter()
+        time.sleep(min(max(delay, 0.0), timeout))
+        return self._due()
+
+    def pull_sample(self, timeout=32000000.0, sample=None):
+        """
+        Returns:
+            tuple: (sample list, timestamp), or (None, None) if nothing was due within timeout
+        """
+        if self._wait(timeout) <= self._next:
+            return None, None
+        i = self._next
+        self._next += 1
+        return self.samples[i].tolist(), float(self.timestamps[i])
+
+    def pull_chunk(self, timeout=0.0, max_samples=1024, dest_obj=None):
+        """
+        Returns:
+            tuple: (samples, timestamps list); samples are written into dest_obj when given
+        """
+        end = min(self._wait(timeout), self._next + max_samples)
+        start = self._next
+        if end <= start:
+            return (dest_obj if dest_obj is not None else []), []
+        self._next = end
+        rows = self.samples[start:end]
+        timestamps = self.timestamps[start:end].tolist()
+        if dest_obj is not None:
+            dest_obj[:end - start] = rows
+            return dest_obj, timestamps
+        return rows.tolist(), timestamps
+
+
+def open_raw_replay(path, speed=1.0):
+    """
+    Open a raw recording (RawRecorder .npy) as an inlet.
+    Args:
+        path (str): Raw recording
+        speed (float): Replay speed factor, None or 0 for as fast as possible
+    Returns:
+        tuple: (ReplayInlet, sampling rate in Hz), like concentration.connect_eeg_stream()
+    """
+    metadata, records = open_raw_recording(path)
+    srate = float(metadata.get('srate') or 256.0)
+    inlet = ReplayInlet(records['lsl_timestamp'], records['eeg'], srate, speed=speed,
+                        name=os.path.basename(path))
+    return inlet, srate
+
+
+def load_ratio_recording(path, column='beta_theta_ratio'):
+    """
+    Timestamps and one ratio column of a ratio recording.
+    CSV files may name the time column 'lsl_timestamp' or 'timestamp'.
+    Args:
+        path (str): .csv or .hfrec recording
+        column (str): Ratio column to load
+    Returns:
+        tuple: (timestamps, ratios) as np.ndarrays
+    """
+    if path.endswith('.hfrec'):
+        _, records = read_recording(path)
+        return records['lsl_timestamp'].astype(np.float64), records[column]
+
+    import pandas as pd
+
+    header = pd.read_csv(path, nrows=0).columns
+    time_column = 'lsl_timestamp' if 'lsl_timestamp' in header else 'timestamp'
+    df = pd.read_csv(path, usecols=[time_column, column])
+    return df[time_column].to_numpy(dtype=np.float64), df[column].to_numpy()
+
+
+def replay_ratios(path, speed=1.0, column='beta_theta_ratio'):
+    """
+    Yield the ratios of a recording on their original schedule (a drop-in
+    source for EEGHub in place of stream_muse_ratios).
+    Args:
+        path (str): .csv or .hfrec recording
+        speed (float): Replay speed factor, None or 0 for as fast as possible
+        column (str): Ratio column to replay
+    Yields:
+        tuple: (recorded timestamp, ratio) per recorded sample
+    """
+    timestamps, ratios = load_ratio_recording(path, column)
+    if not speed:
+        yield from zip(timestamps.tolist(), ratios.tolist())
+        return
+    offsets = ((timestamps - timestamps[0]) / speed).tolist()
+    start = time.perf_counter()
+    for offset, timestamp, ratio in zip(offsets, timestamps.tolist(), ratios.tolist()):
+        delay = start + offset - time.perf_counter()
+        if delay > 0.001:
+            time.sleep(delay)
+        yield timestamp, ratio
+
+
+if __name__ == "__main__":
+    # Headless throughput check: python eeg_replay.py <recording> [speed, 0 = as fast as possible]
+    import concentration
+
+    if len(sys.argv) < 2:
+        print("Usage: python eeg_replay.py <recording .npy/.csv/.hfrec> [speed]")
+        sys.exit(1)
+    speed = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    concentration.use_replay(sys.argv[1], speed=speed)
+    source = concentration.ratio_source or (lambda: concentration.stream_muse_ratios(verbose=False, chunked=True,
+                                                                                      timestamps=True))
+
+    start = time.perf_counter()
+    count = 0
+    for _ in source():
+        count += 1
+    elapsed = time.perf_counter() - start
+    print(f"Replayed {count} ratios in {elapsed:.2f} s ({count / max(elapsed, 1e-9):.0f} ratios/s)")
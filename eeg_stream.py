@@ -0,0 +1,40 @@
+"""
+Chunked LSL ingestion for Muse EEG streams.
+
+Pulls every sample that is available in one `pull_chunk` call into a
+preallocated NumPy array, so the DSP pipeline can run once per chunk instead
+of once per sample.
+"""
+
+import numpy as np
+from pylsl import cf_double64
+
+
+class ChunkReader:
+    """Reads chunks from a StreamInlet into a reusable (max_samples x channels) array."""
+
+    def __init__(self, inlet, max_samples=256):
+        """
+        Args:
+            inlet (StreamInlet): Open LSL inlet
+            max_samples (int): Maximum number of samples returned per read
+        """
+        self.inlet = inlet
+        self.max_samples = max_samples
+        info = inlet.info()
+        self.n_channels = info.channel_count()
+        dtype = np.float64 if info.channel_format() == cf_double64 else np.float32
+        self.buffer = np.zeros((max_samples, self.n_channels), dtype=dtype)
+
+    def read(self, timeout=0.1):
+        """
+        Pull all available samples (up to max_samples).
+        Args:
+            timeout (float): Seconds to wait for the first sample
+        Returns:
+            tuple: (samples, timestamps). samples is a (n, channels) view into the
+            reusable buffer and is overwritten by the next read; n may be 0.
+        """
+        _, timestamps = self.inlet.pull_chunk(timeout=timeout, max_samples=self.max_samples,
+                                              dest_obj=self.buffer)
+        return self.buffer[:len(timestamps)], np.asarray(timestamps)
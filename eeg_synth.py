@@ -0,0 +1,246 @@
+"""
+Deterministic synthetic Muse EEG for load testing and detector evaluation.
+
+SyntheticEEG produces raw 4-channel samples in microvolts: band-limited
+theta/alpha/beta activity whose amplitudes follow a script of focus
+episodes, plus 1/f (pink) background noise, eye-blink artifacts on the
+frontal channels and dropouts (missing samples, like lost Bluetooth
+packets). Every sample comes with a ground-truth focus label, and the same
+seed (generated in the same chunk sizes) always gives the same signal.
+
+Use it in-process through SyntheticEEG.inlet() (a ReplayInlet, so it can be
+replayed at any speed, see concentration.use_synthetic) or publish it as a
+local LSL stream with run_outlet() / `python eeg_synth.py`.
+"""
+
+import sys
+import time
+
+import numpy as np
+from scipy.signal import lfilter, lfilter_zi
+
+from eeg_filters import StreamingFilterBank
+from eeg_replay import ReplayInlet
+
+FOCUSED = 1
+OUT_OF_FOCUS = 0
+LABEL_NAMES = {FOCUSED: 'focused', OUT_OF_FOCUS: 'out_of_focus'}
+
+# Paul Kellet's economy pink-noise filter (1/f within ~1 dB above a few Hz)
+_PINK_B = np.array([0.049922035, -0.095993537, 0.050612699, -0.004408786])
+_PINK_A = np.array([1.0, -2.494956002, 2.017265875, -0.522189400])
+
+
+class SyntheticEEG:
+    """Seedable generator of raw multi-channel EEG with scripted focus episodes."""
+
+    BANDS = {'theta': (4, 8), 'alpha': (8, 13), 'beta': (13, 30)}
+    # Band RMS amplitudes in microvolts for each state (theta, alpha, beta)
+    FOCUSED_AMPLITUDES = (5.0, 6.0, 8.0)
+    OUT_OF_FOCUS_AMPLITUDES = (12.0, 8.0, 3.0)
+
+    def __init__(self, srate=256.0, n_channels=4, seed=None, script=None, pink_level=4.0,
+                 blink_rate=0.2, blink_amplitude=120.0, dropout_rate=0.01, dropout_seconds=0.2,
+                 transition_seconds=1.0, channel_names=('TP9', 'AF7', 'AF8', 'TP10')):
+        """
+        Args:
+            srate (float): Sample rate in Hz
+            n_channels (int): Number of channels
+            seed (int): Random seed; the same seed gives the same signal
+            script (list): (seconds, FOCUSED or OUT_OF_FOCUS) episodes, repeated cyclically;
+                None draws episode lengths at random (20-60 s focused, 10-30 s out of focus)
+            pink_level (float): RMS of the 1/f background noise
+            blink_rate (float): Mean blinks per second
+            blink_amplitude (float): Peak blink amplitude on the frontal channels
+            dropout_rate (float): Mean dropouts per second
+            dropout_seconds (float): Length of each dropout
+            transition_seconds (float): Time constant of the band amplitude change between episodes
+            channel_names (tuple): Channel labels (for the LSL outlet)
+        """
+        self.srate = float(srate)
+        self.n_channels = n_channels
+        self.channel_names = list(channel_names)[:n_channels]
+        self.script = list(script) if script else None
+        self.pink_level = pink_level
+        self.blink_rate = blink_rate
+        self.blink_amplitude = blink_amplitude
+        self.dropout_rate = dropout_rate
+        self.dropout_samples = max(int(dropout_seconds * srate), 1)
+        self.rng = np.random.default_rng(seed)
+
+        # Band-limited activity: band-passed white noise, scaled to unit RMS per band
+        self._bank = StreamingFilterBank(self.srate, self.BANDS.values(), order=4)
+        bandwidths = np.array([high - low for low, high in self.BANDS.values()], dtype=float)
+        self._band_gain = 1.0 / np.sqrt(2.0 * bandwidths / self.srate)
+        self._focused = np.array(self.FOCUSED_AMPLITUDES)
+        self._out_of_focus = np.array(self.OUT_OF_FOCUS_AMPLITUDES)
+        self._channel_gain = self.rng.uniform(0.8, 1.2, size=n_channels)  # fixed electrode differences
+
+        # Smooth transitions: one-pole low-pass of the label
+        self._mix_coeff = 1.0 - np.exp(-1.0 / (transition_seconds * self.srate))
+        self._mix_zi = None
+
+        self._pink_zi = np.zeros((n_channels, len(_PINK_A) - 1))
+        impulse = np.zeros(int(10 * self.srate))
+        impulse[0] = 1.0
+        self._pink_gain = 1.0 / np.sqrt(np.sum(lfilter(_PINK_B, _PINK_A, impulse) ** 2))  # unit RMS
+
+        # Blinks on the frontal channels (AF7, AF8 for a Muse)
+        self.blink_channels = [1, 2] if n_channels == 4 else list(range(n_channels))
+        t = np.arange(int(0.4 * self.srate)) / self.srate
+        self._blink_kernel = np.exp(-0.5 * ((t - 0.2) / 0.05) ** 2)
+        self._blink_tail = np.zeros(len(self._blink_kernel))
+        self._dropout_left = 0
+
+        self.sample_index = 0
+        self.episodes = []  # (start_s, end_s, label), extended as samples are generated
+        self._episode_cursor = 0  # index into script
+
+    def _extend_episodes(self, until_sample):
+        # Append episodes until they cover sample `until_sample`
+        end = self.episodes[-1][1] if self.episodes else 0.0
+        while end * self.srate < until_sample:
+            if self.script:
+                seconds, label = self.script[self._episode_cursor % len(self.script)]
+            else:
+                label = FOCUSED if self._episode_cursor % 2 == 0 else OUT_OF_FOCUS
+                seconds = self.rng.uniform(20, 60) if label == FOCUSED else self.rng.uniform(10, 30)
+            self._episode_cursor += 1
+            self.episodes.append((end, end + seconds, label))
+            end += seconds
+
+    def labels(self, start, n):
+        """Ground-truth labels of samples start .. start + n."""
+        self._extend_episodes(start + n)
+        labels = np.empty(n, dtype=np.int8)
+        times = (start + np.arange(n)) / self.srate
+        for ep_start, ep_end, label in self.episodes:
+            labels[(times >= ep_start) & (times < ep_end)] = label
+        return labels
+
+    def label_at(self, seconds):
+        """Ground-truth label at a time (seconds from the start of the signal)."""
+        self._extend_episodes(int(seconds * self.srate) + 1)
+        for ep_start, ep_end, label in self.episodes:
+            if ep_start <= seconds < ep_end:
+                return label
+        return self.episodes[-1][2]
+
+    def generate(self, n):
+        """
+        Generate the next n sample periods.
+        Samples that fall into a dropout are left out, so fewer than n rows may come back.
+        Args:
+            n (int): Sample periods to generate
+        Returns:
+            tuple: (timestamps (m,) in seconds from the start, samples (m, channels) float32,
+            labels (m,) ground-truth FOCUSED/OUT_OF_FOCUS)
+        """
+        start = self.sample_index
+        self.sample_index += n
+        labels = self.labels(start, n)
+
+        # Band amplitudes follow the (smoothed) label
+        if self._mix_zi is None:
+            self._mix_zi = lfilter_zi([self._mix_coeff], [1.0, self._mix_coeff - 1.0]) * labels[0]
+        mix, self._mix_zi = lfilter([self._mix_coeff], [1.0, self._mix_coeff - 1.0], labels.astype(float),
+                                    zi=self._mix_zi)
+        amplitudes = (self._out_of_focus[:, None]
+                      + mix[None, :] * (self._focused - self._out_of_focus)[:, None])  # (bands, n)
+
+        white = self.rng.standard_normal((self.n_channels, n))
+        bands = self._bank.filter_chunk(white)  # (bands, channels, n)
+        signal = np.einsum('bcn,bn->cn', bands, amplitudes * self._band_gain[:, None])
+        signal *= self._channel_gain[:, None]
+
+        # 1/f background
+        pink, self._pink_zi = lfilter(_PINK_B, _PINK_A, self.rng.standard_normal((self.n_channels, n)),
+                                      axis=-1, zi=self._pink_zi)
+        signal += self.pink_level * self._pink_gain * pink
+
+        signal[self.blink_channels] += self._blinks(n)
+        keep = self._dropouts(n)
+
+        timestamps = (start + np.arange(n)) / self.srate
+        return timestamps[keep], signal.T[keep].astype(np.float32), labels[keep]
+
+    def _blinks(self, n):
+        # Poisson blink onsets; a blink running past the chunk continues in the next one
+        k = len(self._blink_kernel)
+        trace = np.zeros(n + k)
+        trace[:k] += self._blink_tail
+        for onset in self.rng.integers(0, n, size=self.rng.poisson(self.blink_rate * n / self.srate)):
+            trace[onset:onset + k] += self.blink_amplitude * self.rng.uniform(0.7, 1.3) * self._blink_kernel
+        self._blink_tail = trace[n:].copy()
+        return trace[:n]
+
+    def _dropouts(self, n):
+        # Boolean mask of delivered samples
+        keep = np.ones(n, dtype=bool)
+        carried = min(self._dropout_left, n)
+        keep[:carried] = False
+        self._dropout_left -= carried
+        for onset in self.rng.integers(0, n, size=self.rng.poisson(self.dropout_rate * n / self.srate)):
+            keep[onset:onset + self.dropout_samples] = False
+            self._dropout_left = max(self._dropout_left, onset + self.dropout_samples - n)
+        return keep
+
+    def inlet(self, duration, speed=1.0):
+        """
+        Generate `duration` seconds and serve them as an in-process inlet.
+        Args:
+            duration (float): Seconds of signal
+            speed (float): Replay speed factor, None or 0 for as fast as possible
+        Returns:
+            ReplayInlet: Inlet with an extra `labels` array aligned with its timestamps
+        """
+        timestamps, samples, labels = self.generate(int(duration * self.srate))
+        inlet = ReplayInlet(timestamps, samples, self.srate, speed=speed, name='Synthetic EEG')
+        inlet.labels = labels
+        return inlet
+
+
+def run_outlet(generator=None, name='SyntheticMuse', chunk_seconds=0.05, duration=None, speed=1.0):
+    """
+    Publish a SyntheticEEG as a local LSL 'EEG' stream (blocks until duration has elapsed).
+    Args:
+        generator (SyntheticEEG): Signal source (default: seed 0)
+        name (str): LSL stream name
+        chunk_seconds (float): Seconds of data pushed per chunk
+        duration (float): Seconds to stream, None for forever
+        speed (float): Samples are pushed this many times faster than real time
+    """
+    from pylsl import StreamInfo, StreamOutlet, local_clock
+
+    generator = generator or SyntheticEEG(seed=0)
+    info = StreamInfo(name, 'EEG', generator.n_channels, generator.srate, 'float32', f'{name}-synthetic')
+    channels = info.desc().append_child('channels')
+    for label in generator.channel_names:
+        channels.append_child('channel').append_child_value('label', label)
+    outlet = StreamOutlet(info, chunk_size=int(chunk_seconds * generator.srate))
+
+    chunk = max(int(chunk_seconds * generator.srate), 1)
+    start = local_clock()
+    sent = 0
+    print(f"Streaming synthetic EEG as '{name}' ({generator.n_channels} ch, {generator.srate} Hz, {speed}x)")
+    while duration is None or sent / generator.srate < duration:
+        timestamps, samples, _ = generator.generate(chunk)
+        sent += chunk
+        # Push each run between dropouts with the time of its last sample, so the gaps survive
+        breaks = np.flatnonzero(np.diff(timestamps) > 1.5 / generator.srate) + 1
+        for run_ts, run in zip(np.split(timestamps, breaks), np.split(samples, breaks)):
+            if len(run):
+                outlet.push_chunk(run, start + run_ts[-1] / speed)
+        delay = start + sent / generator.srate / speed - local_clock()
+        if delay > 0:
+            time.sleep(delay)
+
+
+if __name__ == "__main__":
+    # python eeg_synth.py [seed] [speed]: stand-in for 'muselsl stream'
+    seed = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+    speed = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    try:
+        run_outlet(SyntheticEEG(seed=seed), speed=speed)
+    except KeyboardInterrupt:
+        print("\nStopped")
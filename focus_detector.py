@@ -0,0 +1,162 @@
+"""
+Incremental sliding-window focus detector.
+
+Keeps running statistics (sum, count, optional sum of squares) of the
+beta/theta ratios in a time-based window and updates them as ratios arrive
+and expire, so the focus decision costs O(1) per sample and can run on every
+ratio instead of every few seconds.
+"""
+
+import math
+from collections import deque
+
+
+class FocusDetector:
+    """Dual-threshold focus classifier over a sliding time window of ratios."""
+
+    def __init__(self, thresholds=None, window_size=10, min_fraction=0.1, track_variance=False,
+                 resum_every=10000):
+        """
+        Args:
+            thresholds (dict): 'beta_theta_ratio_unfocus' and 'beta_theta_ratio_focus' values,
+                or None until calibration is done (status stays 'unknown')
+            window_size (float): Window length in seconds
+            min_fraction (float): Fraction of the window that must be covered before deciding
+            track_variance (bool): Also keep the running sum of squares for the window std
+            resum_every (int): Recompute the sums from the window every this many expirations
+                to stop floating-point drift
+        """
+        self.thresholds = thresholds
+        self.window_size = window_size
+        self.min_fraction = min_fraction
+        self.track_variance = track_variance
+        self.resum_every = resum_every
+        self._window = deque()  # (timestamp, ratio)
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._nan_count = 0
+        self._since_resum = 0
+        self.status = 'unknown'
+
+    def set_thresholds(self, thresholds):
+        """Set (or replace) the calibration thresholds."""
+        self.thresholds = thresholds
+
+    def _add(self, ratio):
+        if math.isnan(ratio):
+            self._nan_count += 1
+            return
+        self._sum += ratio
+        if self.track_variance:
+            self._sum_sq += ratio * ratio
+
+    def _remove(self, ratio):
+        if math.isnan(ratio):
+            self._nan_count -= 1
+            return
+        self._sum -= ratio
+        if self.track_variance:
+            self._sum_sq -= ratio * ratio
+
+    def _resum(self):
+        values = [r for _, r in self._window if not math.isnan(r)]
+        self._sum = math.fsum(values)
+        self._sum_sq = math.fsum(r * r for r in values) if self.track_variance else 0.0
+        self._since_resum = 0
+
+    def update(self, timestamp, ratio):
+        """
+        Add one ratio, expire ratios older than the window and re-classify.
+        Args:
+            timestamp (float): Time of the ratio in seconds
+            ratio (float): beta/theta ratio
+        Returns:
+            str: 'unknown', 'focused', 'out_of_focus' or 'transitioning'
+        """
+        ratio = float(ratio)
+        self._window.append((timestamp, ratio))
+        self._add(ratio)
+        cutoff = timestamp - self.window_size
+        while self._window[0][0] < cutoff:
+            self._remove(self._window.popleft()[1])
+            self._since_resum += 1
+        if self._since_resum >= self.resum_every:
+            self._resum()
+        self.status = self._classify()
+        return self.status
+
+    @property
+    def count(self):
+        """Number of ratios currently in the window."""
+        return len(self._window)
+
+    @property
+    def mean(self):
+        """Window mean ratio (NaN if the window holds a NaN, like np.mean)."""
+        valid = len(self._window) - self._nan_count
+        if self._nan_count or valid == 0:
+            return float('nan')
+        return self._sum / valid
+
+    @property
+    def std(self):
+        """Window standard deviation; requires track_variance=True."""
+        if not self.track_variance:
+            raise ValueError("FocusDetector was created with track_variance=False")
+        valid = len(self._window) - self._nan_count
+        if self._nan_count or valid == 0:
+            return float('nan')
+        mean = self._sum / valid
+        return math.sqrt(max(self._sum_sq / valid - mean * mean, 0.0))
+
+    def _covered(self):
+        # Need at least min_fraction of the window before deciding
+        if not self._window:
+            return False
+        return self._window[-1][0] - self._window[0][0] >= self.window_size * self.min_fraction
+
+    def _classify(self):
+        if self.thresholds is None or not self._covered():
+            return 'unknown'
+        if self._nan_count:
+            return 'focused'
+        window_mean_ratio = self.mean
+        # Out of focus: below baseline * 0.6
+        # Back to focus: above baseline * 0.85
+        if window_mean_ratio < self.thresholds['beta_theta_ratio_unfocus']:
+            return 'out_of_focus'
+        if window_mean_ratio >= self.thresholds['beta_theta_ratio_focus']:
+            return 'focused'
+        return 'transitioning'  # Between thresholds
+
+    def analysis(self):
+        """
+        Current decision in the same format as concentration.sliding_window_analysis.
+        Returns:
+            dict: {'focus_status': ..., 'details': ...}
+        """
+        if self.thresholds is None:
+            return {'focus_status': 'unknown', 'details': 'No thresholds yet'}
+        if not self._covered():
+            return {'focus_status': 'unknown', 'details': 'Insufficient data'}
+        window_mean_ratio = self.mean
+        if self._nan_count:
+            return {
+                'focus_status': 'focused',
+                'details': {
+                    'window_mean_ratio': window_mean_ratio,
+                    'reason': 'NaN detected in data - returning focused status',
+                    'window_samples': self.count
+                }
+            }
+        details = {
+            'window_mean_ratio': window_mean_ratio,
+            'ratio_unfocus_threshold': self.thresholds['beta_theta_ratio_unfocus'],
+            'ratio_focus_threshold': self.thresholds['beta_theta_ratio_focus'],
+            'ratio_out_of_focus': window_mean_ratio < self.thresholds['beta_theta_ratio_unfocus'],
+            'ratio_back_to_focus': window_mean_ratio >= self.thresholds['beta_theta_ratio_focus'],
+            'window_samples': self.count
+        }
+        if self.track_variance:
+            details['window_std_ratio'] = self.std
+        return {'focus_status': self.status, 'details': details}
@@ -0,0 +1,106 @@
+"""
+Push-based focus-status events.
+
+The focus monitor publishes a FocusEvent on every status transition and the
+bus delivers it straight away to callbacks, thread-safe queues and asyncio
+async iterators, so consumers react within milliseconds instead of polling.
+
+Every event carries two times: `timestamp`, the wall-clock time.time() at
+which it was published (comparable across all events), and `stream_time`,
+the LSL (or replay) timestamp of the ratio that caused it, or None when the
+event did not come from the stream. Stream time follows the recording, so
+it is the one to use for replays.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from collections import namedtuple
+
+# status/previous: 'unknown', 'focused', 'out_of_focus' or 'transitioning'
+# timestamp: time.time() when published; stream_time: LSL/replay time of the ratio, or None
+FocusEvent = namedtuple('FocusEvent', ['status', 'previous', 'timestamp', 'details', 'stream_time'],
+                        defaults=(None,))
+
+
+class FocusEventBus:
+    """Delivers focus-status transitions to subscribers."""
+
+    def __init__(self):
+        self._callbacks = ()
+        self._lock = threading.Lock()
+        self.status = 'unknown'
+        self.last_event = None
+
+    def subscribe(self, callback):
+        """
+        Call `callback(event)` on every transition, in the publishing thread.
+        Callbacks must return quickly; hand slow work to a queue or thread.
+        Returns:
+            callable: Function that removes the subscription
+        """
+        with self._lock:
+            self._callbacks = self._callbacks + (callback,)
+
+        def unsubscribe():
+            with self._lock:
+                self._callbacks = tuple(cb for cb in self._callbacks if cb is not callback)
+        return unsubscribe
+
+    def subscribe_queue(self, maxsize=100):
+        """
+        Receive events through a thread-safe queue.Queue.
+        When the queue is full the oldest event is dropped.
+        Returns:
+            tuple: (queue.Queue, unsubscribe function)
+        """
+        events = queue.Queue(maxsize=maxsize)
+
+        def deliver(event):
+            while True:
+                try:
+                    events.put_nowait(event)
+                    return
+                except queue.Full:
+                    try:
+                        events.get_nowait()
+                    except queue.Empty:
+                        pass
+        return events, self.subscribe(deliver)
+
+    async def events(self):
+        """
+        Async iterator over transitions for asyncio consumers:
+            async for event in bus.events(): ...
+        """
+        loop = asyncio.get_running_loop()
+        pending = asyncio.Queue()
+        unsubscribe = self.subscribe(lambda event: loop.call_soon_threadsafe(pending.put_nowait, event))
+        try:
+            while True:
+                yield await pending.get()
+        finally:
+            unsubscribe()
+
+    def publish(self, status, details=None, stream_time=None):
+        """
+        Record the new status and notify subscribers if it changed.
+        Args:
+            status (str): New focus status
+            details (dict): Detector details of the transition
+            stream_time (float): LSL (or replay) timestamp of the ratio that caused it, if any
+        Returns:
+            FocusEvent or None: The event, or None if the status did not change
+        """
+        if status == self.status:
+            return None
+        event = FocusEvent(status, self.status, time.time(), details, stream_time)
+        self.status = status
+        self.last_event = event
+        for callback in self._callbacks:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Focus event callback error: {e}")
+        return event
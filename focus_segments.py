@@ -0,0 +1,75 @@
+"""
+Focus/distraction segments of a video session with running per-color totals.
+
+Both players record the session as closed (start_frame, end_frame, color)
+segments plus one open active segment. The timeline adds each segment's
+length to a per-color total when it is closed, so the on-screen timers and
+the summary screen never have to rescan the segment list.
+"""
+
+import threading
+
+GREEN = (0, 255, 0)  # focused
+RED = (0, 0, 255)  # lost focus
+
+
+class SegmentTimeline:
+    """Append-only list of closed segments, the open active segment and per-color frame totals."""
+
+    def __init__(self, active=None):
+        """
+        Args:
+            active (tuple): Initial open segment as (start_frame, color), or None
+        """
+        self.segments = []  # List of (start_frame, end_frame, color)
+        self.active = active
+        self.totals = {}  # color -> frames in closed segments
+        self.finished = False
+        self._lock = threading.Lock()
+
+    def _close(self, frame):
+        start, color = self.active
+        self.segments.append((start, frame, color))
+        self.totals[color] = self.totals.get(color, 0) + (frame - start)
+        self.active = None
+
+    def switch(self, frame, color):
+        """Close the active segment (if any) at frame and open a new one with color."""
+        with self._lock:
+            if self.finished:
+                return
+            if self.active is not None:
+                self._close(frame)
+            self.active = (frame, color)
+
+    def close(self, frame):
+        """Close the active segment (if any) at frame, e.g. when the video ends."""
+        with self._lock:
+            if self.active is not None:
+                self._close(frame)
+
+    def finish(self, frame):
+        """Close the active segment at frame and ignore any later switch (the session is over)."""
+        with self._lock:
+            if self.active is not None:
+                self._close(frame)
+            self.finished = True
+
+    def frames(self, color, current_frame=None):
+        """
+        Frames spent in color so far.
+        Args:
+            color (tuple): Segment color
+            current_frame (int): Count the open active segment up to this frame (None to skip it)
+        Returns:
+            float: Number of frames
+        """
+        with self._lock:
+            total = self.totals.get(color, 0)
+            if current_frame is not None and self.active is not None and self.active[1] == color:
+                total += current_frame - self.active[0]
+        return total
+
+    def seconds(self, color, current_frame, fps):
+        """Seconds spent in color up to current_frame, including the active segment."""
+        return self.frames(color, current_frame) / fps
@@ -0,0 +1,172 @@
+"""
+Focus nudges rendered straight into the video frames.
+
+Instead of changing system brightness or opening a second Tk overlay, the
+nudges here are composited into each OpenCV frame before it is shown: a
+dim/flash through a precomputed lookup table and a pre-rendered,
+alpha-blended bouncing "FOCUS" sprite. Timing follows the playback clock, so
+it is frame-accurate and needs no subprocesses or extra GUI loop.
+"""
+
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class DimFlashNudge:
+    """Dims the whole frame on and off, `pulses` times."""
+
+    def __init__(self, pulses=3, period=0.2, dim_factor=0.35):
+        """
+        Args:
+            pulses (int): Number of dim/restore pulses
+            period (float): Seconds each dim and each restore lasts
+            dim_factor (float): Brightness multiplier while dimmed
+        """
+        self.pulses = pulses
+        self.period = period
+        self.duration = 2 * pulses * period
+        # One table lookup per pixel instead of per-frame float math
+        self._lut = np.clip(np.arange(256) * dim_factor, 0, 255).astype(np.uint8)
+
+    def render(self, frame, elapsed):
+        """Draw onto frame (in place) at `elapsed` seconds; returns False once finished."""
+        phase = int(elapsed / self.period)
+        if phase >= 2 * self.pulses:
+            return False
+        if phase % 2 == 0:
+            cv2.LUT(frame, self._lut, dst=frame)
+        return True
+
+
+class BouncingTextNudge:
+    """A "FOCUS" sprite that bounces around the frame and changes color on every bounce."""
+
+    COLORS = [(255, 255, 0), (255, 0, 255), (0, 255, 255), (0, 255, 0), (0, 165, 255),
+              (255, 255, 255), (0, 0, 255), (255, 0, 0), (128, 0, 128)]  # BGR
+
+    def __init__(self, text="FOCUS", duration=10.0, speed=(240.0, 180.0), font_scale=2.0, thickness=4, seed=None):
+        """
+        Args:
+            text (str): Text of the sprite
+            duration (float): Seconds the sprite is shown
+            speed (tuple): (x, y) speed in pixels per second
+            font_scale (float): OpenCV font scale of the sprite
+            thickness (int): Stroke thickness of the sprite
+            seed (int): Seed for the random start position
+        """
+        self.duration = duration
+        self.speed = speed
+        self._rng = np.random.default_rng(seed)
+        self._start = None
+
+        # Render the text once into an alpha mask; every frame only blends it
+        font = cv2.FONT_HERSHEY_DUPLEX
+        (w, h), baseline = cv2.getTextSize(text, font, font_scale, thickness)
+        mask = np.zeros((h + baseline + thickness, w + thickness), dtype=np.uint8)
+        cv2.putText(mask, text, (thickness // 2, h + thickness // 2), font, font_scale, 255, thickness, cv2.LINE_AA)
+        alpha = (mask.astype(np.float32) / 255.0)[..., None]
+        self._inv_alpha = 1.0 - alpha
+        # Premultiplied sprite for every color
+        self._sprites = [alpha * np.array(color, dtype=np.float32) for color in self.COLORS]
+
+    @staticmethod
+    def _bounce(distance, span):
+        # Position after travelling `distance` between walls 0 and span, plus bounces so far
+        if span <= 0:
+            return 0, 0
+        bounces, offset = divmod(distance, span)
+        position = offset if bounces % 2 == 0 else span - offset
+        return int(position), int(bounces)
+
+    def render(self, frame, elapsed):
+        """Blend the sprite into frame (in place) at `elapsed` seconds; returns False once finished."""
+        if elapsed >= self.duration:
+            return False
+        sprite_h, sprite_w = self._inv_alpha.shape[:2]
+        span_x = frame.shape[1] - sprite_w
+        span_y = frame.shape[0] - sprite_h
+        if span_x < 0 or span_y < 0:
+            return True  # frame too small for the sprite
+        if self._start is None:
+            self._start = (self._rng.uniform(0, span_x), self._rng.uniform(0, span_y))
+        x, bounces_x = self._bounce(self._start[0] + self.speed[0] * elapsed, span_x)
+        y, bounces_y = self._bounce(self._start[1] + self.speed[1] * elapsed, span_y)
+        sprite = self._sprites[(bounces_x + bounces_y) % len(self._sprites)]
+        roi = frame[y:y + sprite_h, x:x + sprite_w]
+        roi[:] = (roi * self._inv_alpha + sprite).astype(np.uint8)
+        return True
+
+
+class NudgeCompositor:
+    """Holds the active in-frame nudges and composites them into each frame."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = []  # [nudge, start time or None, done event]
+
+    def start(self, nudge):
+        """
+        Show a nudge from the next composited frame on (callable from any thread).
+        Returns:
+            threading.Event: Set when the nudge has finished or was cancelled
+        """
+        done = threading.Event()
+        with self._lock:
+            self._active.append([nudge, None, done])
+        return done
+
+    def cancel(self, done=None):
+        """Remove one nudge (identified by its done event), or all of them."""
+        with self._lock:
+            for entry in self._active:
+                if done is None or entry[2] is done:
+                    entry[2].set()
+            self._active = [entry for entry in self._active if not entry[2].is_set()]
+
+    def apply(self, frame, now):
+        """
+        Composite every active nudge into frame (in place).
+        Args:
+            frame (np.ndarray): BGR frame about to be shown
+            now (float): Playback time of the frame in seconds
+        """
+        with self._lock:
+            if not self._active:
+                return frame
+            entries = list(self._active)
+        for entry in entries:
+            nudge, start, done = entry
+            if start is None:
+                start = entry[1] = now
+            if done.is_set() or not nudge.render(frame, now - start):
+                done.set()
+        with self._lock:
+            self._active = [entry for entry in self._active if not entry[2].is_set()]
+        return frame
+
+    def action(self, factory, name, margin=2.0):
+        """
+        Wrap an in-frame nudge as a NudgeExecutor action, so cooldowns, rate
+        limits and cancellation work the same as for volume/brightness nudges.
+        The action gives up after the nudge's duration plus `margin` seconds,
+        so it never holds a worker when no frames are being composited.
+        Args:
+            factory (callable): Returns a new nudge (e.g. DimFlashNudge)
+            name (str): Name used for cooldown bookkeeping and logging
+            margin (float): Extra seconds for the nudge to start (frames may be late or dropped)
+        Returns:
+            callable: action(cancel_event=None)
+        """
+        def run(cancel_event=None):
+            nudge = factory()
+            done = self.start(nudge)
+            deadline = time.monotonic() + nudge.duration + margin
+            while not done.wait(0.05):
+                if (cancel_event is not None and cancel_event.is_set()) or time.monotonic() >= deadline:
+                    self.cancel(done)
+                    return
+        run.__name__ = name
+        return run
@@ -0,0 +1,270 @@
+"""
+Decode-ahead reading and real-time pacing for video playback.
+
+FramePrefetcher decodes frames on a background thread into a small bounded
+queue, so decoding overlaps with drawing and display. FramePacer presents
+frame i at start + i / fps on an absolute clock: per-frame work no longer
+adds up into drift against the audio track, and frames that are already a
+full frame behind are dropped instead of slowing playback further.
+With an AudioClock as master the video follows pygame's audio position
+instead, seeking when it has fallen far behind. A FrameScaler given to the
+prefetcher shrinks frames to the display size on the decode thread, so all
+overlay drawing happens on the small frame.
+"""
+
+import queue
+import threading
+import time
+
+import cv2
+
+from instrumentation import histogram
+
+
+def fit_size(src_size, max_size):
+    """
+    Largest size that fits in max_size and keeps the aspect ratio of src_size.
+    Args:
+        src_size (tuple): (width, height) of the video
+        max_size (tuple): (width, height) of the display area
+    Returns:
+        tuple: (width, height), never larger than src_size
+    """
+    scale = min(max_size[0] / src_size[0], max_size[1] / src_size[1], 1.0)
+    return max(int(round(src_size[0] * scale)), 1), max(int(round(src_size[1] * scale)), 1)
+
+
+class FrameScaler:
+    """Resizes frames to one fixed display size with an interpolation chosen once."""
+
+    def __init__(self, src_size, dst_size):
+        """
+        Args:
+            src_size (tuple): (width, height) of the decoded frames
+            dst_size (tuple): (width, height) to display
+        """
+        self.src_size = tuple(src_size)
+        self.dst_size = tuple(dst_size)
+        self.identity = self.src_size == self.dst_size
+        # Area averaging when shrinking (no aliasing of slide text), linear when enlarging
+        shrinking = dst_size[0] < src_size[0] or dst_size[1] < src_size[1]
+        self.interpolation = cv2.INTER_AREA if shrinking else cv2.INTER_LINEAR
+
+    def __call__(self, frame):
+        if self.identity:
+            return frame
+        return cv2.resize(frame, self.dst_size, interpolation=self.interpolation)
+
+
+class FramePrefetcher:
+    """Background reader that keeps up to `maxsize` decoded frames ready."""
+
+    def __init__(self, cap, maxsize=8, transform=None):
+        """
+        Args:
+            cap (cv2.VideoCapture): Opened video
+            maxsize (int): Frames decoded ahead of playback
+            transform (callable): Applied to every frame on the reader thread (e.g. a FrameScaler)
+        """
+        self.cap = cap
+        self.transform = transform
+        self.decoded = 0
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._stop = threading.Event()
+        self._seek_lock = threading.Lock()
+        self._seek_to = None
+        self._thread = threading.Thread(target=self._run, name='frame prefetch', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _put(self, item):
+        # Block while the queue is full, but give up once stopped
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self):
+        index = 0
+        decode_stage = histogram('video.decode')
+        while not self._stop.is_set():
+            with self._seek_lock:
+                target, self._seek_to = self._seek_to, None
+            if target is not None:
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+                index = target
+                self._drain()
+            decode_start = time.perf_counter_ns()
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+            self.decoded += 1
+            if self.transform is not None:
+                frame = self.transform(frame)
+            decode_stage.record_since(decode_start)
+            if not self._put((index, frame)):
+                return
+            index += 1
+        self._put(None)  # end of video
+
+    def get(self):
+        """
+        Returns:
+            tuple: (frame_index, frame), or None at the end of the video
+        """
+        return self._queue.get()
+
+    def seek(self, index):
+        """Continue decoding from frame index; frames already queued are discarded."""
+        with self._seek_lock:
+            self._seek_to = index
+
+    def _drain(self):
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+    def stop(self):
+        """Stop decoding and wait for the reader thread."""
+        self._stop.set()
+        self._drain()
+        self._thread.join(timeout=1.0)
+
+
+class AudioClock:
+    """
+    Media time in seconds from pygame.mixer.music.get_pos().
+    get_pos() only advances once per audio buffer, so between its updates the
+    time is interpolated with perf_counter. When the music stops (get_pos() < 0)
+    the clock keeps running from the last known position.
+    """
+
+    def __init__(self, music=None):
+        if music is None:
+            import pygame
+            music = pygame.mixer.music
+        self.music = music
+        self._last_pos = None
+        self._last_at = None
+
+    def __call__(self):
+        now = time.perf_counter()
+        pos = self.music.get_pos()
+        if pos < 0:
+            if self._last_pos is None:
+                return 0.0
+            return self._last_pos + (now - self._last_at)
+        pos /= 1000.0
+        if pos != self._last_pos:  # new position from the mixer: re-anchor
+            self._last_pos, self._last_at = pos, now
+        return self._last_pos + (now - self._last_at)
+
+
+class FramePacer:
+    """
+    Schedules frames against a master clock and counts dropped and late frames.
+    The clock is free-running by default; pass an AudioClock to slave the video
+    to the audio track, optionally seeking when it falls far behind. The drift
+    between each shown frame and the clock is recorded.
+    """
+
+    def __init__(self, fps, clock=None, tolerance=None, late_after=0.5, seek_after=None):
+        """
+        Args:
+            fps (float): Video frame rate
+            clock (callable): Returns the media time in seconds (None for a wall clock from start())
+            tolerance (float): Drop frames more than this many seconds behind the clock
+                (default one frame period)
+            late_after (float): Count a frame as late when shown this many frame periods past its deadline
+            seek_after (float): Seek instead of dropping when this many seconds behind (None to never seek)
+        """
+        self.period = 1.0 / fps
+        self.clock = clock if clock is not None else self._wall_clock
+        self.tolerance = tolerance if tolerance is not None else self.period
+        self.late_after = late_after * self.period
+        self.seek_after = seek_after
+        self.start_time = None
+        self.presented = 0
+        self.dropped = 0
+        self.late = 0
+        self.seeks = 0
+        self._seeking_to = None
+        # Drift (frame time - clock time) of shown frames
+        self._drift_sum = 0.0
+        self._drift_sq_sum = 0.0
+        self._drift_max = 0.0
+
+    def _wall_clock(self):
+        return time.perf_counter() - self.start_time
+
+    def start(self, start_time=None):
+        """Start the wall clock (call right after starting the audio)."""
+        self.start_time = time.perf_counter() if start_time is None else start_time
+
+    def frame_time(self, index):
+        return index * self.period
+
+    def seek_target(self, index):
+        """
+        Frame to seek to if frame index is more than seek_after behind the clock.
+        Returns:
+            int or None: Target frame (counted as a seek), or None to keep going
+        """
+        if self.seek_after is None:
+            return None
+        if self._seeking_to is not None:
+            if index < self._seeking_to:
+                return None  # frames still queued from before the seek
+            self._seeking_to = None
+        now = self.clock()
+        if now - self.frame_time(index) > self.seek_after:
+            self._seeking_to = int(now / self.period) + 1
+            self.seeks += 1
+            self.dropped += 1  # this frame is skipped too
+            return self._seeking_to
+        return None
+
+    def should_drop(self, index):
+        """True (and counted) if frame index is too far behind to be worth drawing."""
+        if self._seeking_to is not None and index < self._seeking_to:
+            self.dropped += 1
+            return True
+        if self.clock() - self.frame_time(index) > self.tolerance:
+            self.dropped += 1
+            return True
+        return False
+
+    def wait(self, index):
+        """
+        Sleep until frame index is due.
+        Returns:
+            float: Seconds past its time (0 if on time)
+        """
+        self.presented += 1
+        delay = self.frame_time(index) - self.clock()
+        if delay > 0:
+            time.sleep(delay)
+        drift = self.frame_time(index) - self.clock()
+        self._drift_sum += drift
+        self._drift_sq_sum += drift * drift
+        self._drift_max = max(self._drift_max, abs(drift))
+        if delay > 0:
+            return 0.0
+        if -delay > self.late_after:
+            self.late += 1
+        return -delay
+
+    def stats(self):
+        """Frame counters plus A/V drift in ms (positive: video ahead of the clock)."""
+        n = max(self.presented, 1)
+        mean = self._drift_sum / n
+        std = max(self._drift_sq_sum / n - mean * mean, 0.0) ** 0.5
+        return {'presented': self.presented, 'dropped': self.dropped, 'late': self.late, 'seeks': self.seeks,
+                'drift_mean_ms': mean * 1000, 'drift_std_ms': std * 1000, 'drift_max_ms': self._drift_max * 1000}
@@ -0,0 +1,167 @@
+"""
+Always-on latency instrumentation for the hot paths.
+
+Each pipeline stage (LSL pull, filtering, band power, detector, plotting,
+decode, compositing, imshow, recorder writes, ...) owns a LatencyHistogram.
+A span is two time.perf_counter_ns() calls around the stage, and recording it
+is a few integer operations plus one list increment: no locks, no
+allocation, no I/O. Buckets are fixed and logarithmic (four per power of two
+nanoseconds, so percentiles are within about 10%), which is plenty to tell a
+50 us stage from a 5 ms one.
+
+Stages that run once per EEG sample time only every few samples (see
+concentration.SAMPLE_TIMING_STRIDE), so their counts are a sample of the
+calls. Every histogram should be written by one thread (the thread running that
+stage); dumps from other threads read a slightly stale but consistent-enough
+snapshot. Dump with dump(), on SIGUSR1 (SIGBREAK on Windows, see
+install_signal_dump) or at session end.
+
+Usage:
+    stage = histogram('dsp.filter')
+    start = time.perf_counter_ns()
+    ...
+    stage.record_since(start)
+"""
+
+import signal
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+SUB_BITS = 2  # 2 ** SUB_BITS buckets per power of two (hard-coded in LatencyHistogram.record)
+N_BUCKETS = 65 << SUB_BITS  # covers every 64-bit nanosecond duration
+
+_histograms = {}
+_registry_lock = threading.Lock()
+
+
+def _bucket(ns):
+    # The bit length plus the SUB_BITS bits below the top one; tiny values map to themselves
+    # (inlined in LatencyHistogram.record)
+    bits = ns.bit_length()
+    if bits <= SUB_BITS:
+        return ns
+    return (bits << SUB_BITS) | ((ns >> (bits - 1 - SUB_BITS)) & ((1 << SUB_BITS) - 1))
+
+
+def _bucket_range_ns(index):
+    # (smallest, largest) duration that falls into bucket index
+    if index < (1 << SUB_BITS):
+        return index, index
+    bits, sub = index >> SUB_BITS, index & ((1 << SUB_BITS) - 1)
+    width = 1 << (bits - 1 - SUB_BITS)
+    lower = (1 << (bits - 1)) + sub * width
+    return lower, lower + width - 1
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of durations in nanoseconds."""
+
+    __slots__ = ('name', 'counts', 'total_ns', 'max_ns')
+
+    def __init__(self, name):
+        self.name = name
+        self.counts = [0] * N_BUCKETS
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns):
+        bits = ns.bit_length()
+        self.counts[(bits << 2) | ((ns >> (bits - 3)) & 3) if bits > 2 else ns] += 1  # _bucket(ns)
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def record_since(self, start_ns):
+        """Record the time elapsed since start_ns (a time.perf_counter_ns() value)."""
+        self.record(time.perf_counter_ns() - start_ns)
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def percentile(self, q):
+        """Middle of the bucket holding the q-th percentile, in nanoseconds."""
+        counts = list(self.counts)  # snapshot
+        total = sum(counts)
+        if total == 0:
+            return 0
+        rank = q / 100.0 * total
+        seen = 0
+        for index, n in enumerate(counts):
+            seen += n
+            if n and seen >= rank:
+                lower, upper = _bucket_range_ns(index)
+                return min((lower + upper) // 2, self.max_ns)
+        return self.max_ns
+
+    def summary(self):
+        """Count, mean, p50/p90/p99 and max in milliseconds."""
+        count = self.count
+        return {
+            'count': count,
+            'mean_ms': self.total_ns / count / 1e6 if count else 0.0,
+            'p50_ms': self.percentile(50) / 1e6,
+            'p90_ms': self.percentile(90) / 1e6,
+            'p99_ms': self.percentile(99) / 1e6,
+            'max_ms': self.max_ns / 1e6,
+            'total_s': self.total_ns / 1e9,
+        }
+
+    def reset(self):
+        self.counts = [0] * N_BUCKETS
+        self.total_ns = 0
+        self.max_ns = 0
+
+
+def histogram(name):
+    """The histogram of a stage, created on first use (fetch it once, outside the hot loop)."""
+    stage = _histograms.get(name)
+    if stage is None:
+        with _registry_lock:
+            stage = _histograms.setdefault(name, LatencyHistogram(name))
+    return stage
+
+
+@contextmanager
+def span(name):
+    """Time a block into histogram(name); for code outside per-sample loops."""
+    stage = histogram(name)
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        stage.record_since(start)
+
+
+def summary():
+    """Summaries of every stage that recorded something, by name."""
+    return {name: stage.summary() for name, stage in sorted(_histograms.items()) if stage.count}
+
+
+def dump(title="Stage latencies", file=None):
+    """Print a table of every stage (count, mean, p50/p90/p99, max in ms, total seconds)."""
+    file = file or sys.stdout
+    stats = summary()
+    print(f"\n{title}:", file=file)
+    if not stats:
+        print("  (nothing recorded)", file=file)
+        return
+    print(f"  {'stage':<26}{'count':>9}{'mean':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}{'total s':>9}",
+          file=file)
+    for name, s in stats.items():
+        print(f"  {name:<26}{s['count']:>9}{s['mean_ms']:>9.3f}{s['p50_ms']:>9.3f}{s['p90_ms']:>9.3f}"
+              f"{s['p99_ms']:>9.3f}{s['max_ms']:>9.2f}{s['total_s']:>9.2f}", file=file)
+
+
+def install_signal_dump():
+    """Dump the histograms on SIGUSR1 (Ctrl+Break / SIGBREAK on Windows); main thread only."""
+    sig = getattr(signal, 'SIGUSR1', None) or getattr(signal, 'SIGBREAK', None)
+    if sig is None:
+        return False
+    try:
+        signal.signal(sig, lambda signum, frame: dump())
+    except ValueError:  # not called from the main thread
+        return False
+    return True
@@ -0,0 +1,96 @@
+"""
+Non-blocking executor for focus nudges (volume boost, brightness flicker, ...).
+
+Nudges run on a small worker pool so the focus monitor never blocks on them.
+The executor enforces a cooldown per nudge and a global rate limit, and can
+cancel in-flight nudges as soon as focus returns. A nudge is any callable
+taking a `cancel_event` (threading.Event) that it checks between steps, and
+that restores the original volume/brightness when it stops.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class NudgeExecutor:
+    """Runs nudges on worker threads with cooldowns, rate limiting and cancellation."""
+
+    def __init__(self, cooldown=30.0, max_nudges=3, rate_window=120.0, max_workers=2, cooldowns=None):
+        """
+        Args:
+            cooldown (float): Minimum seconds between two runs of the same nudge
+            max_nudges (int): At most this many nudges start within rate_window seconds
+            rate_window (float): Length of the rate-limit window in seconds
+            max_workers (int): Worker threads (nudges that may run at once)
+            cooldowns (dict): Per-nudge cooldown overrides, keyed by function name
+        """
+        self.cooldown = cooldown
+        self.cooldowns = dict(cooldowns or {})
+        self.max_nudges = max_nudges
+        self.rate_window = rate_window
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='nudge')
+        self._lock = threading.Lock()
+        self._last_started = {}  # nudge name -> time.monotonic() of last start
+        self._recent_starts = deque()
+        self._in_flight = {}  # future -> (name, cancel_event)
+
+    def _name(self, action):
+        return getattr(action, '__name__', repr(action))
+
+    def trigger(self, action):
+        """
+        Start a nudge on the worker pool unless a cooldown or the rate limit forbids it.
+        Never blocks on the nudge itself.
+        Args:
+            action (callable): Nudge taking a cancel_event keyword argument
+        Returns:
+            Future or None: The running nudge, or None if it was skipped
+        """
+        name = self._name(action)
+        now = time.monotonic()
+        with self._lock:
+            if any(running_name == name for running_name, _ in self._in_flight.values()):
+                return None
+            cooldown = self.cooldowns.get(name, self.cooldown)
+            last = self._last_started.get(name)
+            if last is not None and now - last < cooldown:
+                return None
+            while self._recent_starts and now - self._recent_starts[0] >= self.rate_window:
+                self._recent_starts.popleft()
+            if len(self._recent_starts) >= self.max_nudges:
+                return None
+            self._last_started[name] = now
+            self._recent_starts.append(now)
+            cancel_event = threading.Event()
+            future = self._pool.submit(self._run, action, name, cancel_event)
+            self._in_flight[future] = (name, cancel_event)
+        future.add_done_callback(self._finished)
+        return future
+
+    def _run(self, action, name, cancel_event):
+        try:
+            action(cancel_event=cancel_event)
+        except Exception as e:
+            print(f"[NUDGE] {name} failed: {e}")
+
+    def _finished(self, future):
+        with self._lock:
+            self._in_flight.pop(future, None)
+
+    def cancel_all(self):
+        """Ask every in-flight nudge to stop (they restore the original level)."""
+        with self._lock:
+            for _, cancel_event in self._in_flight.values():
+                cancel_event.set()
+
+    @property
+    def busy(self):
+        """True while at least one nudge is running."""
+        return bool(self._in_flight)
+
+    def shutdown(self, wait=True):
+        """Cancel running nudges and stop the worker pool."""
+        self.cancel_all()
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,78 @@
+"""
+Cached focus progress bar for the video players.
+
+The bar is kept as a persistent image. Closed segments are painted once when
+they appear and the active segment only gets its newly covered columns, so
+drawing the bar onto a frame is one slice assignment plus the position
+marker, however many segments the session has.
+"""
+
+import cv2
+import numpy as np
+
+
+class ProgressBarLayer:
+    """Persistent, incrementally painted progress-bar image."""
+
+    def __init__(self, width, total_frames, height=30, background=(230, 230, 230)):
+        """
+        Args:
+            width (int): Bar width in pixels (the frame width)
+            total_frames (float): Frame count of the video
+            height (int): Bar height in pixels
+            background (tuple): BGR color of the unplayed part
+        """
+        self.width = width
+        self.total_frames = total_frames
+        self.height = height
+        self.image = np.empty((height, width, 3), dtype=np.uint8)
+        self.image[:] = background
+        self._painted_segments = 0  # segments[:n] are already on the image
+        self._active_segment = None
+        self._active_x = -1  # last column painted for the active segment
+
+    def matches(self, width, total_frames):
+        """True if this layer was built for the given frame width and video length."""
+        return self.width == width and self.total_frames == total_frames
+
+    def _x(self, frame_index):
+        return int((frame_index / max(self.total_frames, 1)) * self.width)
+
+    def _fill(self, x1, x2, color):
+        # Same pixels cv2.rectangle((x1, top), (x2, bottom), color, -1) filled: x2 inclusive
+        x1 = max(x1, 0)
+        x2 = min(x2, self.width - 1)
+        if x2 >= x1:
+            self.image[:, x1:x2 + 1] = color
+
+    def update(self, segments, active_segment, current_frame):
+        """
+        Paint whatever changed since the last call.
+        Args:
+            segments (list): (start_frame, end_frame, color) of closed segments, append-only
+            active_segment (tuple): (start_frame, color) of the open segment, or None
+            current_frame (int): Current playback frame
+        """
+        # One slice: segments appended meanwhile (monitor thread) are painted next time
+        new_segments = segments[self._painted_segments:]
+        for start, end, color in new_segments:
+            self._fill(self._x(start), self._x(end), color)
+        self._painted_segments += len(new_segments)
+
+        if active_segment is not None:
+            start, color = active_segment
+            if active_segment != self._active_segment:
+                self._active_segment = active_segment
+                self._active_x = self._x(start) - 1
+            x2 = self._x(current_frame)
+            if x2 > self._active_x:
+                self._fill(self._active_x + 1, x2, color)
+                self._active_x = x2
+
+    def draw(self, frame, segments, active_segment, current_frame):
+        """Bring the layer up to date and copy it onto the bottom of frame (in place)."""
+        self.update(segments, active_segment, current_frame)
+        bar_top = frame.shape[0] - self.height
+        frame[bar_top:] = self.image
+        cur_x = self._x(current_frame)
+        cv2.line(frame, (cur_x, bar_top - 5), (cur_x, frame.shape[0] + 5), (0, 0, 0), 2)
@@ -0,0 +1,86 @@
+"""
+Preallocated circular buffer for streaming EEG data.
+
+Every sample is written twice, at its slot and at the same slot in a mirrored
+second half, so the last N samples are always one contiguous slice. Appends
+are O(1) and reading the window never allocates or copies.
+"""
+
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed-capacity circular buffer with zero-copy views of the newest samples."""
+
+    def __init__(self, capacity, n_channels=None, dtype=float):
+        """
+        Args:
+            capacity (int): Number of samples kept per channel
+            n_channels (int or tuple): Number of channels (or a shape such as
+                (n_bands, n_channels)), or None for a single 1-D channel
+            dtype: NumPy dtype of the stored samples
+        """
+        self.capacity = int(capacity)
+        self.n_channels = n_channels
+        if n_channels is None:
+            channel_shape = ()
+        elif isinstance(n_channels, tuple):
+            channel_shape = n_channels
+        else:
+            channel_shape = (n_channels,)
+        shape = channel_shape + (2 * self.capacity,)
+        # Starts zero-filled, like the np.zeros buffers it replaces
+        self._data = np.zeros(shape, dtype=dtype)
+        self._pos = 0  # slot the next sample is written to
+        self._count = 0
+
+    def __len__(self):
+        """Number of samples written so far, capped at capacity."""
+        return self._count
+
+    def append(self, value):
+        """
+        Append one sample in O(1).
+        Args:
+            value: Scalar, or an array of the channel shape for multi-channel buffers
+        """
+        pos = self._pos
+        self._data[..., pos] = value
+        self._data[..., pos + self.capacity] = value
+        self._pos = (pos + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def extend(self, values):
+        """
+        Append a chunk of samples.
+        Args:
+            values (array-like): Shape (n,) for 1-D buffers or (*channel shape, n), oldest first
+        """
+        values = np.asarray(values)
+        n = values.shape[-1]
+        if n > self.capacity:
+            values = values[..., -self.capacity:]
+            n = self.capacity
+        idx = (self._pos + np.arange(n)) % self.capacity
+        self._data[..., idx] = values
+        self._data[..., idx + self.capacity] = values
+        self._pos = (self._pos + n) % self.capacity
+        self._count = min(self._count + n, self.capacity)
+
+    def last(self, n=None):
+        """
+        Zero-copy view of the newest samples, oldest first.
+        The view is only valid until the next append/extend; copy it to keep it.
+        Args:
+            n (int): Number of samples, defaults to the full capacity
+        Returns:
+            np.ndarray: Shape (n,) or (*channel shape, n)
+        """
+        if n is None or n > self.capacity:
+            n = self.capacity
+        end = self._pos + self.capacity
+        return self._data[..., end - n:end]
+
+    def to_array(self):
+        """Return an unwrapped copy of the whole buffer, oldest first."""
+        return self.last().copy()
@@ -1,5 +1,6 @@
 import threading
 import time
+import queue
 import random
 import cv2
 import numpy as np
@@ -9,6 +10,12 @@ import time
 import concentration
 from volume_change import volume_boost
 from brightness import flicker_brightness
+from nudge_executor import NudgeExecutor
+from frame_nudges import NudgeCompositor, DimFlashNudge, BouncingTextNudge
+from progress_bar import ProgressBarLayer
+from focus_segments import SegmentTimeline, GREEN, RED
+from frame_pacing import FramePrefetcher, FramePacer, AudioClock, FrameScaler, fit_size
+from instrumentation import histogram, dump as dump_latencies, install_signal_dump
 
 import logging, random
 logger = logging.getLogger(__name__)
@@ -18,42 +25,51 @@ VIDEO_PATH = "./hyperFocus/assets/How to Speak So That People Want to Listen _ J
 AUDIO_PATH = "./hyperFocus/assets/audio.mp3"
 
 # Globals
-segments = []
-active_segment = None
+timeline = SegmentTimeline()  # focus segments with running green/red totals
 video_fps = 30
 video_frame_count = 1
-frame_number = 0
+frame_number = 0  # frame being shown (frames played, once the video has ended)
+playback_done = threading.Event()  # set by play_video when the video has ended
+progress_bar = None
+playback_stats = {}  # frame counters and A/V drift of the last play_video
+
+# 'audio': pace the video by pygame.mixer.music.get_pos() (the audio is the master clock)
+# 'clock': pace the video by its own wall clock started with the audio
+SYNC_MODE = 'audio'
+SYNC_TOLERANCE = 0.040  # seconds behind the audio before frames are dropped
+SYNC_SEEK_AFTER = 0.5  # seconds behind the audio before seeking instead of dropping
+
+# Frames are scaled down to fit this (width, height) before anything is drawn on them;
+# None shows the video at its source resolution
+DISPLAY_SIZE = (1280, 720)
+
+# Nudges run on worker threads so the monitor never blocks on them
+nudges = NudgeExecutor(cooldown=30.0, max_nudges=3, rate_window=120.0)
+
+# 'system' nudges change the OS volume/brightness; 'in_frame' nudges are drawn
+# into the video frames by play_video (frame-accurate, any OS)
+NUDGE_MODE = 'system'
+compositor = NudgeCompositor()
+SYSTEM_NUDGES = [volume_boost, flicker_brightness]
+IN_FRAME_NUDGES = [volume_boost,
+                   compositor.action(DimFlashNudge, 'dim_flash'),
+                   compositor.action(BouncingTextNudge, 'bouncing_focus_text')]
 
 
 def draw_progress_bar(frame, current_frame):
-    bar_height = 30
-    bar_top = frame.shape[0] - bar_height
-    bar_bottom = frame.shape[0]
-    width = frame.shape[1]
-
-    cv2.rectangle(frame, (0, bar_top), (width, bar_bottom), (230, 230, 230), -1)
-
-    for start, end, color in segments:
-        x1 = int((start / video_frame_count) * width)
-        x2 = int((end / video_frame_count) * width)
-        cv2.rectangle(frame, (x1, bar_top), (x2, bar_bottom), color, -1)
-
-    if active_segment is not None:
-        start, color = active_segment
-        x1 = int((start / video_frame_count) * width)
-        x2 = int((current_frame / video_frame_count) * width)
-        cv2.rectangle(frame, (x1, bar_top), (x2, bar_bottom), color, -1)
-
-    cur_x = int((current_frame / video_frame_count) * width)
-    cv2.line(frame, (cur_x, bar_top - 5), (cur_x, bar_bottom + 5), (0, 0, 0), 2)
+    global progress_bar
+    # Built once per frame width; segments are painted into it incrementally
+    if progress_bar is None or not progress_bar.matches(frame.shape[1], video_frame_count):
+        progress_bar = ProgressBarLayer(frame.shape[1], video_frame_count)
+    progress_bar.draw(frame, timeline.segments, timeline.active, current_frame)
 
 
 def show_summary_screen():
     width, height = 600, 400
     summary_img = np.ones((height, width, 3), dtype=np.uint8) * 255
 
-    green_frames = sum(end - start for start, end, color in segments if color == (0, 255, 0))
-    red_frames = sum(end - start for start, end, color in segments if color == (0, 0, 255))
+    green_frames = timeline.frames(GREEN)
+    red_frames = timeline.frames(RED)
 
     green_percent = (green_frames / video_frame_count) * 100
     red_percent = (red_frames / video_frame_count) * 100
@@ -78,64 +94,120 @@ def show_summary_screen():
 
 
 def monitor_focus():
-    global active_segment, segments, frame_number
-    color= (0, 255, 0) #default color
-    while frame_number < video_frame_count:
-        time.sleep(1)
-        status = concentration.get_focus_status()
+    color = GREEN  # default color
+    # Focus transitions are pushed to us as they happen instead of polled every second
+    events, unsubscribe = concentration.focus_events.subscribe_queue()
+    while not playback_done.is_set():
+        try:
+            event = events.get(timeout=1.0)  # timeout only to notice the video has ended
+        except queue.Empty:
+            continue
+        if playback_done.is_set():
+            break
+        status = event.status
         if status == 'focused':
-            color = (0, 255, 0)
+            color = GREEN
+            # Focus is back: stop any ramp still running (it restores volume/brightness)
+            nudges.cancel_all()
         elif status == 'out_of_focus':
-            color = (0, 0, 255)
+            color = RED
             #random.choice([volume_boost, flicker_brightness])()
             # 1. Pick the nudge but don’t run it yet
-            action = random.choice([volume_boost, flicker_brightness])
+            action = random.choice(IN_FRAME_NUDGES if NUDGE_MODE == 'in_frame' else SYSTEM_NUDGES)
 
             # 2. Log what we chose (use the function’s __name__ for readability)
             print(f"[NUDGE] Selected: {action.__name__}")
 
-            # 3. Execute the nudge
-            action()
+            # 3. Execute the nudge in the background (skipped during its cooldown)
+            if nudges.trigger(action) is None:
+                print(f"[NUDGE] Skipped {action.__name__} (cooldown / rate limit)")
         else:
             continue
 
-        if active_segment is not None:
-            segments.append((active_segment[0], frame_number, active_segment[1]))
-        active_segment = (frame_number, color)
+        timeline.switch(frame_number, color)
+    unsubscribe()
+    nudges.shutdown(wait=False)
 
 
 def play_video():
-    global frame_number, video_fps, video_frame_count, active_segment
+    global frame_number, video_fps, video_frame_count, playback_stats
     pygame.mixer.init()
     pygame.mixer.music.load(AUDIO_PATH)
 
     cap = cv2.VideoCapture(VIDEO_PATH)
     if not cap.isOpened():
         print("❌ Error opening video.")
+        playback_done.set()
         return
 
     video_fps = cap.get(cv2.CAP_PROP_FPS)
     video_frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
 
+    # Decode ahead on a background thread; show each frame at its own deadline
+    src_size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    scaler = None
+    if DISPLAY_SIZE is not None:
+        scaler = FrameScaler(src_size, fit_size(src_size, DISPLAY_SIZE))
+    reader = FramePrefetcher(cap, maxsize=8, transform=scaler).start()
+    if SYNC_MODE == 'audio':
+        pacer = FramePacer(video_fps, clock=AudioClock(), tolerance=SYNC_TOLERANCE, seek_after=SYNC_SEEK_AFTER)
+    else:
+        pacer = FramePacer(video_fps)
+
+    # Per-stage latency histograms (see instrumentation.py)
+    compose_stage = histogram('video.nudges')
+    bar_stage = histogram('video.progress_bar')
+    show_stage = histogram('video.imshow')
+
     pygame.mixer.music.play()
+    pacer.start()
     frame_number = 0
+    consumed = 0  # frames shown or dropped so far
+    playback_done.clear()
 
     while True:
-        ret, frame = cap.read()
-        if not ret:
+        item = reader.get()
+        if item is None:
             break
+        frame_number, frame = item
+        consumed = frame_number + 1
+        target = pacer.seek_target(frame_number)
+        if target is not None:
+            reader.seek(target)  # far behind the audio: jump instead of dropping frame by frame
+            continue
+        if pacer.should_drop(frame_number):
+            continue  # already a frame behind: skip it to catch up
 
+        compose_start = time.perf_counter_ns()
+        compositor.apply(frame, frame_number / video_fps)
+        bar_start = time.perf_counter_ns()
+        compose_stage.record(bar_start - compose_start)
         draw_progress_bar(frame, frame_number)
+        bar_stage.record_since(bar_start)
+        pacer.wait(frame_number)
+        show_start = time.perf_counter_ns()
         cv2.imshow("Focus Monitor", frame)
+        key = cv2.waitKey(1) & 0xFF
+        show_stage.record_since(show_start)
 
-        if cv2.waitKey(int(1000 / video_fps)) & 0xFF == ord('q'):
+        if key == ord('q'):
             break
-
-        frame_number += 1
-
-    if active_segment is not None:
-        segments.append((active_segment[0], frame_number, active_segment[1]))
-
+        if key == ord('i'):
+            dump_latencies()  # stage latencies so far
+
+    frame_number = consumed
+    timeline.finish(frame_number)  # later focus events no longer open segments
+    playback_done.set()
+    compositor.cancel()  # no more frames: release any in-frame nudge still waiting for them
+
+    reader.stop()
+    playback_stats = dict(pacer.stats(), decoded=reader.decoded)
+    print(f"Playback: {playback_stats['decoded']} decoded, {playback_stats['presented']} shown, "
+          f"{playback_stats['dropped']} dropped, {playback_stats['late']} late")
+    print(f"A/V drift ({SYNC_MODE} clock): mean {playback_stats['drift_mean_ms']:.1f} ms, "
+          f"std {playback_stats['drift_std_ms']:.1f} ms, max {playback_stats['drift_max_ms']:.1f} ms, "
+          f"{playback_stats['seeks']} seeks")
+    dump_latencies("Stage latencies (press 'i' during playback for a live dump)")
     cap.release()
     pygame.mixer.music.stop()
     show_summary_screen()
@@ -143,6 +215,7 @@ def play_video():
 
 # Launch focus tracking and video playback
 if __name__ == "__main__":
+    install_signal_dump()
     ready = threading.Event()
     threading.Thread(target=concentration.main, daemon=True).start()
     threading.Thread(target=monitor_focus, daemon=True).start()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+DSP Pipeline Benchmark
+
+Runs the ratio generators of concentration.py on synthetic EEG (eeg_synth.py)
+served through concentration.eeg_source, plus the filter and band-power
+components on their own, and reports for every engine and setting:
+
+    samples/s      processed samples per second of CPU time
+    p50/p99        latency of one call (one sample, one chunk, or one Welch hop)
+    per-sample     mean processing cost per sample
+    headroom       real-time budget (1 / srate = 3.9 ms at 256 Hz) / per-sample cost
+
+Pipeline engines (stream, stream_chunked, stream_welch) are the real
+generators, including inlet pulls, channel selection, NaN handling and the
+stage instrumentation; they always use the beta and theta bands. Component
+engines (per_sample, chunked, ewma, welch) time the DSP classes alone, for
+any number of bands.
+
+Results are saved as JSON so runs can be compared over time.
+
+Usage:
+    python benchmark_dsp.py                         # full grid
+    python benchmark_dsp.py --quick                 # small grid
+    python benchmark_dsp.py --engines stream_chunked welch --output results.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import scipy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import concentration
+from eeg_filters import StreamingFilterBank
+from band_power import RunningBandPower, ExponentialBandPower, WelchBandPower
+from eeg_synth import SyntheticEEG
+
+SRATE = 256.0
+# Beta and theta first: the ratio is always band 0 / band 1
+ALL_BANDS = [(13, 30), (4, 8), (8, 13), (1, 4), (30, 45)]
+MUSE_CHUNK = 12  # samples per Muse LSL packet
+WELCH_HOP = 0.25  # seconds between Welch ratios in the stream_welch engine
+PIPELINE_ENGINES = ['stream', 'stream_chunked', 'stream_welch']
+COMPONENT_ENGINES = ['per_sample', 'chunked', 'ewma', 'welch']
+
+
+def _ratio(power):
+    # Combined beta/theta ratio as in concentration._beta_theta_ratios
+    return np.mean(power[0], axis=0) / (np.mean(power[1], axis=0) + 1e-10)
+
+
+def make_engine(name, bands, n_channels, window):
+    """
+    Build one pipeline variant.
+    Args:
+        name (str): 'per_sample', 'chunked', 'ewma' or 'welch'
+        bands (list): (low, high) band ranges; band 0 / band 1 is the ratio
+        n_channels (int): Channels processed together
+        window (int): Band-power window in samples
+    Returns:
+        tuple: (step function taking a (n, channels) block, samples per call)
+    """
+    if name == 'welch':
+        power = WelchBandPower(SRATE, bands, window_seconds=window / SRATE, segment_seconds=window / SRATE / 2,
+                               n_channels=n_channels)
+
+        def step(block):
+            result = power.update_chunk(block.T)
+            if result is not None:
+                _ratio(result)
+        return step, MUSE_CHUNK
+
+    bank = StreamingFilterBank(SRATE, bands, order=4)
+    if name == 'per_sample':
+        # What stream_muse_ratios does for every sample
+        power = RunningBandPower(window, n_channels=(len(bands), n_channels))
+
+        def step(block):
+            _ratio(power.update(bank.filter_sample(block[0])))
+        return step, 1
+
+    if name == 'chunked':
+        power = RunningBandPower(window, n_channels=(len(bands), n_channels))
+    elif name == 'ewma':
+        power = ExponentialBandPower(window, n_channels=(len(bands), n_channels))
+    else:
+        raise ValueError(f"Unknown engine: {name}")
+
+    def step(block):
+        _ratio(power.update_chunk(bank.filter_chunk(block.T)))
+    return step, MUSE_CHUNK
+
+
+def make_stream(name, n_channels, window):
+    """
+    Build one of the real concentration.py ratio generators.
+    Args:
+        name (str): 'stream' (per sample), 'stream_chunked' or 'stream_welch'
+        n_channels (int): Stream channels combined into the ratio
+        window (int): RMS band-power window in samples (not used by stream_welch)
+    Returns:
+        tuple: (generator factory, samples per generator step)
+    """
+    channels = tuple(range(n_channels))
+    if name == 'stream':
+        return (lambda: concentration.stream_muse_ratios(verbose=False, channels=channels, power_window=window)), 1
+    if name == 'stream_chunked':
+        return (lambda: concentration.stream_muse_ratio_chunks(max_chunk=MUSE_CHUNK, channels=channels,
+                                                               verbose=False, power_window=window)), MUSE_CHUNK
+    if name == 'stream_welch':
+        return (lambda: concentration.stream_muse_welch_ratios(hop=WELCH_HOP, max_chunk=MUSE_CHUNK, channels=channels,
+                                                               verbose=False)), int(WELCH_HOP * SRATE)
+    raise ValueError(f"Unknown engine: {name}")
+
+
+def _result(engine, level, n_bands, n_channels, window, call_size, samples, latencies):
+    # latencies in ms, one per call
+    per_sample_ms = latencies.sum() / samples
+    return {
+        'engine': engine,
+        'level': level,
+        'bands': n_bands,
+        'channels': n_channels,
+        'window': window,
+        'call_samples': call_size,
+        'samples': samples,
+        'samples_per_sec': samples / (latencies.sum() / 1000.0),
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'per_sample_ms': per_sample_ms,
+        'headroom': (1000.0 / SRATE) / per_sample_ms,
+    }
+
+
+def run_stream_case(engine, n_channels, window, inlet):
+    """
+    Time a real ratio generator reading inlet (through concentration.eeg_source) until
+    the inlet runs dry; returns the result dict.
+    """
+    factory, call_size = make_stream(engine, n_channels, window)
+    previous_source = concentration.eeg_source
+    concentration.eeg_source = lambda: (inlet, SRATE)
+    try:
+        generator = factory()
+        next(generator)  # opens the inlet and builds the filters; not timed
+        latencies = []
+        clock = time.perf_counter_ns
+        while True:
+            start = clock()
+            try:
+                next(generator)
+            except StopIteration:
+                break
+            latencies.append(clock() - start)
+    finally:
+        concentration.eeg_source = previous_source
+    latencies = np.array(latencies) / 1e6  # ms
+    return _result(engine, 'pipeline', 2, n_channels, window, call_size, len(latencies) * call_size, latencies)
+
+
+def run_case(engine, bands, n_channels, window, data):
+    """Time one component engine over data; returns the result dict."""
+    step, call_size = make_engine(engine, bands, n_channels, window)
+    blocks = [data[i:i + call_size] for i in range(0, len(data) - call_size + 1, call_size)]
+    for block in blocks[:max(len(blocks) // 20, 1)]:
+        step(block)  # warm up
+    latencies = np.empty(len(blocks))
+    clock = time.perf_counter_ns
+    for i, block in enumerate(blocks):
+        start = clock()
+        step(block)
+        latencies[i] = clock() - start
+    latencies /= 1e6  # ms
+    return _result(engine, 'component', len(bands), n_channels, window, call_size, len(blocks) * call_size,
+                   latencies)
+
+
+def _print_row(result):
+    print(f"{result['engine']:<15}{result['bands']:>6}{result['channels']:>4}{result['window'] or '-':>7}"
+          f"{result['samples_per_sec']:>12.0f}{result['p50_ms']:>9.3f}{result['p99_ms']:>9.3f}"
+          f"{result['per_sample_ms']:>11.4f}{result['headroom']:>9.0f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the EEG DSP pipeline against the real-time budget")
+    parser.add_argument('--engines', nargs='+', default=PIPELINE_ENGINES + COMPONENT_ENGINES)
+    parser.add_argument('--windows', nargs='+', type=int, default=[25, 50, 128, 256])
+    parser.add_argument('--bands', nargs='+', type=int, default=[2, 3, 5], help="Bands (component engines only)")
+    parser.add_argument('--channels', nargs='+', type=int, default=[1, 4])
+    parser.add_argument('--seconds', type=float, default=60.0, help="Seconds of synthetic EEG per case")
+    parser.add_argument('--quick', action='store_true', help="Windows 50, 2 bands, 1 and 4 channels, 20 s")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help="JSON file (default benchmark_dsp_<timestamp>.json)")
+    args = parser.parse_args()
+    if args.quick:
+        args.windows, args.bands, args.seconds = [50], [2], 20.0
+
+    n_channels_max = max(args.channels)
+
+    def synthetic():
+        return SyntheticEEG(srate=SRATE, n_channels=n_channels_max, seed=args.seed, dropout_rate=0.0)
+
+    _, data, _ = synthetic().generate(int(args.seconds * SRATE))
+    data = data.astype(np.float64)
+
+    print(f"Real-time budget: {1000.0 / SRATE:.2f} ms/sample at {SRATE:.0f} Hz")
+    print(f"{'engine':<15}{'bands':>6}{'ch':>4}{'window':>7}{'samples/s':>12}{'p50 ms':>9}{'p99 ms':>9}"
+          f"{'ms/sample':>11}{'headroom':>10}")
+    results = []
+    for engine in args.engines:
+        if engine in PIPELINE_ENGINES:
+            windows = [None] if engine == 'stream_welch' else args.windows
+            for n_channels, window in itertools.product(args.channels, windows):
+                # The same seeded signal as the component engines, served as an inlet
+                inlet = synthetic().inlet(args.seconds, speed=0)
+                results.append(run_stream_case(engine, n_channels, window, inlet))
+                _print_row(results[-1])
+        else:
+            for n_bands, n_channels, window in itertools.product(args.bands, args.channels, args.windows):
+                results.append(run_case(engine, ALL_BANDS[:n_bands], n_channels, window, data[:, :n_channels]))
+                _print_row(results[-1])
+
+    output = args.output or f"benchmark_dsp_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, 'w') as f:
+        json.dump({
+            'created': datetime.now().isoformat(),
+            'srate': SRATE,
+            'budget_ms': 1000.0 / SRATE,
+            'seconds_per_case': args.seconds,
+            'seed': args.seed,
+            'environment': {
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'scipy': scipy.__version__,
+                'machine': platform.machine(),
+                'platform': platform.platform(),
+            },
+            'results': results,
+        }, f, indent=2)
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,8 @@ Then run this script:
     python muse_connect.py
 """
 
+import os
+import sys
 from collections import deque
 
 import numpy as np
@@ -18,15 +20,15 @@ import matplotlib.pyplot as plt
 from pylsl import StreamInlet, resolve_byprop
 import time
 
-from brainflow.data_filter import DataFilter, FilterTypes, DetrendOperations
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from eeg_filters import StreamingFilterBank
+from eeg_stream import ChunkReader
+from band_power import RunningBandPower
+from ring_buffer import RingBuffer
 
 BAND_NAMES = ['Filtered (1-50 Hz)', 'Alpha (8-13 Hz)', 'Beta (13-30 Hz)', 'Theta (4-8 Hz)', 'Beta/Theta Ratio', 'Beta/(Alpha+Theta) Ratio']
 BAND_RANGES = [(1, 50), (8, 13), (13, 30), (4, 8)]  # (low, high) frequency ranges in Hz
 
-def calculate_band_power(buffer):
-    """Calculate the power of a frequency band using RMS"""
-    return np.sqrt(np.mean(np.square(buffer)))
-
 
 def main():
     try:
@@ -52,6 +54,13 @@ def main():
         srate = float(streams[0].nominal_srate())  # Convert to float immediately
         print(f"Sampling rate: {srate} Hz")
 
+        # Stateful band-pass filters, one per band in BAND_RANGES
+        filter_bank = StreamingFilterBank(srate, BAND_RANGES, order=4)
+        reader = ChunkReader(inlet, max_samples=256)
+
+        # Running RMS power over the last 50 samples of the alpha, beta and theta bands
+        band_power = RunningBandPower(50, n_channels=3)
+
         # Create figure
         plt.ion()  # Enable interactive mode
         fig, axes = plt.subplots(6, 1, figsize=(12, 15), sharex=True)
@@ -64,23 +73,23 @@ def main():
         times = np.linspace(-duration, 0, samples)
         
         # Initialize buffers for raw and each frequency band
-        raw_buffer = np.zeros(samples)
-        band_buffers = [np.zeros(samples) for _ in range(4)]  # 4 basic bands
-        ratio_buffers = [np.zeros(samples) for _ in range(2)]  # 2 ratio bands
+        raw_buffer = RingBuffer(samples)
+        band_buffers = RingBuffer(samples, n_channels=4)  # 4 basic bands
+        ratio_buffers = RingBuffer(samples, n_channels=2)  # 2 ratio bands
         
         # Create plot lines for each band and ratio
         lines = []
         
         for idx, (ax, name) in enumerate(zip(axes, BAND_NAMES)):
             if idx == 0:  # First plot shows raw and filtered
-                raw_line, = ax.plot(times, raw_buffer, 'b-', alpha=0.5, label='Raw')
-                band_line, = ax.plot(times, band_buffers[idx], 'r-', label='Filtered')
+                raw_line, = ax.plot(times, raw_buffer.last(), 'b-', alpha=0.5, label='Raw')
+                band_line, = ax.plot(times, band_buffers.last()[idx], 'r-', label='Filtered')
                 lines.append((raw_line, band_line))
             elif idx < 4:  # Next plots show frequency bands
-                band_line, = ax.plot(times, band_buffers[idx], '-', label=name)
+                band_line, = ax.plot(times, band_buffers.last()[idx], '-', label=name)
                 lines.append((None, band_line))
             else:  # Last two plots show ratios
-                ratio_line, = ax.plot(times, ratio_buffers[idx-4], '-', label=name)
+                ratio_line, = ax.plot(times, ratio_buffers.last()[idx-4], '-', label=name)
                 lines.append((None, ratio_line))
 
             # Configure each subplot
@@ -102,65 +111,47 @@ def main():
         while True:
             start = time.time()
             try:
-                # Get data from the inlet
-                sample, timestamp = inlet.pull_sample(timeout=0.1)
-                if sample:
-                    # Roll the buffers
-                    raw_buffer = np.roll(raw_buffer, -1)
-                    for i in range(len(band_buffers)):
-                        band_buffers[i] = np.roll(band_buffers[i], -1)
-                    for i in range(len(ratio_buffers)):
-                        ratio_buffers[i] = np.roll(ratio_buffers[i], -1)
-
-                    
+                # Get every sample available from the inlet
+                chunk, timestamps = reader.read(timeout=0.1)
+                n = len(timestamps)
+                if n:
                     # Update raw data buffer with first channel (we'll just use TP9)
-                    raw_buffer[-1] = sample[0]
+                    raw_buffer.extend(chunk[:, 0])
                         
                     try:
-                        # Process each frequency band
-                        for idx, ((low_freq, high_freq), buffer) in enumerate(zip(BAND_RANGES, band_buffers)):
-
-                            # Create a copy of the current buffer for filtering
-                            data_to_filter = raw_buffer.copy()
-                            
-                            # Remove DC offset
-                            DataFilter.detrend(data_to_filter, DetrendOperations.CONSTANT.value)
-                            
-                            # Apply bandpass filter for the specific frequency band
-                            DataFilter.perform_bandpass(data_to_filter, int(srate), low_freq, high_freq, 4,
-                                                     FilterTypes.BUTTERWORTH.value, 0)
-                            
-                            # Update band buffer
-                            band_buffers[idx][-1] = data_to_filter[-1]
+                        # Filter the whole chunk through every frequency band
+                        filtered = filter_bank.filter_chunk(chunk[:, 0])
+                        band_buffers.extend(filtered)
 
-                        # Calculate ratios using the most recent data
+                        # Calculate ratios for every new sample (last 50 samples each)
                         # Beta/Theta ratio
-                        beta_power = calculate_band_power(band_buffers[2][-50:])  # Use last 50 samples
-                        theta_power = calculate_band_power(band_buffers[3][-50:])
-                        alpha_power = calculate_band_power(band_buffers[1][-50:])
+                        alpha_power, beta_power, theta_power = band_power.update_chunk(filtered[1:])
 
                         # Avoid division by zero
-                        ratio_buffers[0][-1] = beta_power / (theta_power + 1e-10)
-                        ratio_buffers[1][-1] = beta_power / (alpha_power + theta_power + 1e-10)
+                        ratio_buffers.extend([beta_power / (theta_power + 1e-10),
+                                              beta_power / (alpha_power + theta_power + 1e-10)])
 
 
                             
-                        # Update plot lines
+                        # Update plot lines from zero-copy views of the buffers
+                        bands = band_buffers.last()
+                        ratios = ratio_buffers.last()
                         for idx in range(len(BAND_NAMES)):
                             if idx == 0:  # First plot shows both raw and filtered
-                                lines[idx][0].set_ydata(raw_buffer)
-                                lines[idx][1].set_ydata(band_buffers[idx])
+                                lines[idx][0].set_ydata(raw_buffer.last())
+                                lines[idx][1].set_ydata(bands[idx])
                             elif idx < 4:  # Frequency bands
-                                lines[idx][1].set_ydata(band_buffers[idx])
+                                lines[idx][1].set_ydata(bands[idx])
                             else:  # Ratio plots
-                                lines[idx][1].set_ydata(ratio_buffers[idx-4])
+                                lines[idx][1].set_ydata(ratios[idx-4])
                             
                     except Exception as filter_error:
-                        print(f"Filtering error on band {BAND_NAMES[idx]}: {filter_error}")
+                        print(f"Filtering error: {filter_error}")
                     
-                    # Update the figure
-                    counter += 1
-                    if counter % update_every == 0:
+                    # Update the figure roughly every update_every samples
+                    counter += n
+                    if counter >= update_every:
+                        counter = 0
                         fig.canvas.draw()
                         fig.canvas.flush_events()
                 else:
@@ -4,13 +4,27 @@ Muse EEG Data Recorder
 
 Records beta/theta and beta/(alpha+theta) ratios from Muse EEG headband.
 First run 'muselsl stream' in another terminal, then run this script.
+
+By default the ratios are written as a binary recording (.hfrec); convert it
+with `python eeg_recording.py <recording>.hfrec <output>.csv` (or .parquet).
+With RECORD_RAW the raw 4-channel EEG is also kept (muse_raw_<timestamp>.npy),
+so metrics can be re-derived offline with eeg_recording.open_raw_recording().
 """
 
-import numpy as np
+import os
+import sys
+import time
 import csv
+from contextlib import nullcontext
 from datetime import datetime
 from pylsl import StreamInlet, resolve_byprop
-from brainflow.data_filter import DataFilter, FilterTypes, DetrendOperations
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from eeg_filters import StreamingFilterBank
+from eeg_stream import ChunkReader
+from band_power import RunningBandPower
+from eeg_recording import BinaryRecorder, RawRecorder
+from instrumentation import histogram, dump as dump_latencies, install_signal_dump
 
 BAND_RANGES = {
     'alpha': (8, 13),
@@ -18,9 +32,36 @@ BAND_RANGES = {
     'theta': (4, 8)
 }
 
-def calculate_band_power(buffer):
-    """Calculate the power of a frequency band using RMS"""
-    return np.sqrt(np.mean(np.square(buffer)))
+# 'binary': buffered fixed-width records (see eeg_recording.py); 'csv': one text row per sample
+OUTPUT_FORMAT = 'binary'
+FLUSH_INTERVAL = 1.0  # seconds of data that may be lost on a crash
+
+# Also keep the raw samples of these channels (memory-mapped .npy)
+RECORD_RAW = True
+RAW_CHANNELS = ['TP9', 'AF7', 'AF8', 'TP10']
+
+COLUMNS = [('lsl_timestamp', 'f8'), ('beta_theta_ratio', 'f8'), ('beta_alpha_theta_ratio', 'f8')]
+
+class CsvRecorder:
+    """The original text format: one row per sample, flushed once per chunk."""
+
+    def __init__(self, filename):
+        self.csvfile = open(filename, 'w', newline='')
+        self.writer = csv.writer(self.csvfile)
+        self.writer.writerow(['lsl_timestamp', 'iso_timestamp', 'beta_theta_ratio', 'beta_alpha_theta_ratio'])
+
+    def append(self, timestamps, beta_theta_ratio, beta_alpha_theta_ratio):
+        self.writer.writerows(
+            [ts, datetime.fromtimestamp(ts).isoformat(), bt, bat]
+            for ts, bt, bat in zip(timestamps.tolist(), beta_theta_ratio.tolist(),
+                                   beta_alpha_theta_ratio.tolist()))
+        self.csvfile.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.csvfile.close()
 
 def main():
     try:
@@ -41,73 +82,80 @@ def main():
         srate = float(streams[0].nominal_srate())
         print(f"✅ Connected to Muse stream at {srate} Hz")
 
-        # Create buffers for raw data and bands
-        buffer_duration = 1  # 1 second buffer
-        buffer_size = int(buffer_duration * srate)
-        raw_buffer = np.zeros(buffer_size)
-        
-        # Initialize band buffers
-        alpha_buffer = np.zeros(buffer_size)
-        beta_buffer = np.zeros(buffer_size)
-        theta_buffer = np.zeros(buffer_size)
+        # Stateful band-pass filters, one per band (in BAND_RANGES order)
+        filter_bank = StreamingFilterBank(srate, BAND_RANGES.values(), order=4)
+
+        # Running RMS band power over the last 50 samples (rows: alpha, beta, theta)
+        band_power = RunningBandPower(50, n_channels=len(BAND_RANGES))
+
+        # Pull everything available per read
+        reader = ChunkReader(inlet, max_samples=256)
+
+        # Per-stage latency histograms, dumped when recording stops (or on SIGUSR1 / Ctrl+Break)
+        pull_stage = histogram('record.pull')
+        dsp_stage = histogram('record.dsp')
+        write_stage = histogram('record.write')
+        raw_stage = histogram('record.raw_write')
+        install_signal_dump()
 
         # Create output file
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"muse_recording_{timestamp}.csv"
-        
-        with open(filename, 'w', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(['lsl_timestamp', 'iso_timestamp', 'beta_theta_ratio', 'beta_alpha_theta_ratio'])
-            
+        if OUTPUT_FORMAT == 'binary':
+            filename = f"muse_recording_{timestamp}.hfrec"
+            recorder = BinaryRecorder(filename, COLUMNS, srate=srate, channel_names=['TP9'],
+                                      flush_interval=FLUSH_INTERVAL)
+        else:
+            filename = f"muse_recording_{timestamp}.csv"
+            recorder = CsvRecorder(filename)
+
+        raw_recorder = nullcontext()
+        if RECORD_RAW:
+            raw_filename = f"muse_raw_{timestamp}.npy"
+            raw_recorder = RawRecorder(raw_filename, len(RAW_CHANNELS), srate=srate, channel_names=RAW_CHANNELS,
+                                       flush_interval=FLUSH_INTERVAL)
+
+        with recorder, raw_recorder:
             print(f"Recording data to {filename}")
+            if RECORD_RAW:
+                print(f"Recording raw EEG to {raw_filename}")
             print("Press Ctrl+C to stop recording")
             
             while True:
-                sample, timestamp = inlet.pull_sample(timeout=0.1)
+                pull_start = time.perf_counter_ns()
+                chunk, timestamps = reader.read(timeout=0.1)
+                pull_stage.record_since(pull_start)
+                n = len(timestamps)
                 
-                if sample:
-                    # Update raw buffer
-                    raw_buffer = np.roll(raw_buffer, -1)
-                    raw_buffer[-1] = sample[0]  # Using TP9 channel
-                    
-                    # Process each frequency band
-                    for band_name, (low_freq, high_freq) in BAND_RANGES.items():
-                        # Copy and filter data
-                        filtered_data = raw_buffer.copy()
-                        DataFilter.detrend(filtered_data, DetrendOperations.CONSTANT.value)
-                        DataFilter.perform_bandpass(filtered_data, int(srate), low_freq, high_freq, 4,
-                                                 FilterTypes.BUTTERWORTH.value, 0)
-                        
-                        # Update appropriate buffer
-                        if band_name == 'alpha':
-                            alpha_buffer = np.roll(alpha_buffer, -1)
-                            alpha_buffer[-1] = filtered_data[-1]
-                        elif band_name == 'beta':
-                            beta_buffer = np.roll(beta_buffer, -1)
-                            beta_buffer[-1] = filtered_data[-1]
-                        elif band_name == 'theta':
-                            theta_buffer = np.roll(theta_buffer, -1)
-                            theta_buffer[-1] = filtered_data[-1]
+                if n:
+                    if RECORD_RAW:
+                        raw_start = time.perf_counter_ns()
+                        raw_recorder.append(timestamps, chunk)
+                        raw_stage.record_since(raw_start)
+
+                    dsp_start = time.perf_counter_ns()
+
+                    # Filter the TP9 channel of the whole chunk through every band
+                    filtered = filter_bank.filter_chunk(chunk[:, 0])
                     
-                    # Calculate ratios
-                    beta_power = calculate_band_power(beta_buffer[-50:])  # Use last 50 samples
-                    theta_power = calculate_band_power(theta_buffer[-50:])
-                    alpha_power = calculate_band_power(alpha_buffer[-50:])
+                    # Calculate band power for every new sample (last 50 samples each)
+                    alpha_power, beta_power, theta_power = band_power.update_chunk(filtered)
                     
                     # Calculate attention ratios
                     beta_theta_ratio = beta_power / (theta_power + 1e-10)  # Avoid division by zero
                     beta_alpha_theta_ratio = beta_power / (alpha_power + theta_power + 1e-10)
+                    write_start = time.perf_counter_ns()
+                    dsp_stage.record(write_start - dsp_start)
                     
-                    # Write to CSV
-                    iso_timestamp = datetime.fromtimestamp(timestamp).isoformat()
-                    writer.writerow([timestamp, iso_timestamp, beta_theta_ratio, beta_alpha_theta_ratio])
-                    csvfile.flush()  # Ensure data is written immediately
+                    # Append the chunk (written to disk in blocks)
+                    recorder.append(timestamps, beta_theta_ratio, beta_alpha_theta_ratio)
+                    write_stage.record_since(write_start)
                     
                     # Print current values
-                    print(f"β/θ: {beta_theta_ratio:.2f} | β/(α+θ): {beta_alpha_theta_ratio:.2f}", end='\r')
+                    print(f"β/θ: {beta_theta_ratio[-1]:.2f} | β/(α+θ): {beta_alpha_theta_ratio[-1]:.2f}", end='\r')
                     
     except KeyboardInterrupt:
         print("\n✋ Recording stopped by user")
+        dump_latencies("Recorder stage latencies")
     except Exception as e:
         print(f"\n❌ Error: {e}")
 
@@ -0,0 +1,51 @@
+"""
+A replayed session must give the same focus events at any replay speed.
+
+Runs concentration.main() headless on the recordings in data/ at speed 0
+(as fast as possible) and at 20x, and compares the published focus events.
+
+Usage:
+    python -m pytest testing/test_replay_determinism.py
+    python testing/test_replay_determinism.py
+"""
+
+import os
+import sys
+
+import matplotlib
+matplotlib.use('Agg')  # no window
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import concentration
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+RECORDINGS = ['time_test_1.csv', 'muse_recording_20250612_204817.csv']
+
+
+def replay_events(path, speed):
+    """(status, stream_time) of every focus event main() publishes while replaying path."""
+    events = []
+    concentration.use_replay(path, speed=speed)
+    concentration.focus_events.publish('unknown')  # start every run from the same bus state
+    unsubscribe = concentration.focus_events.subscribe(lambda event: events.append((event.status, event.stream_time)))
+    try:
+        concentration.main(record_duration=20, record_start_time=2, continue_plotting=True)
+    finally:
+        unsubscribe()
+        concentration.eeg_source = concentration.ratio_source = None
+        concentration.lossless_hub = False
+    return events
+
+
+def test_focus_events_identical_at_any_replay_speed():
+    for name in RECORDINGS:
+        path = os.path.join(DATA_DIR, name)
+        fast = replay_events(path, speed=0)
+        paced = replay_events(path, speed=20)
+        assert len(fast) > 1, f"{name}: no focus transitions to compare"
+        assert fast == paced, f"{name}: {len(fast)} events at speed 0, {len(paced)} at speed 20"
+
+
+if __name__ == "__main__":
+    test_focus_events_identical_at_any_replay_speed()
+    print("Focus events identical at speed 0 and 20")
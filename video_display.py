@@ -4,6 +4,9 @@ import threading
 from playsound import playsound
 import pygame
 
+from progress_bar import ProgressBarLayer
+from focus_segments import SegmentTimeline, GREEN, RED
+
 
 
 # Global variables
@@ -14,11 +17,12 @@ green_button_rect = (0, 0, 0, 0)
 speed_up_button_rect = (0, 0, 0, 0)
 speed_down_button_rect = (0, 0, 0, 0)
 
-active_segment = (0, (0, 255, 0))
-segments = []  # List of (start_frame, end_frame, color)
+# Closed segments, the active segment and running green/red totals
+timeline = SegmentTimeline(active=(0, GREEN))
 
 video_fps = 30
 video_frame_count = 1
+progress_bar = None
 # playback_speed = 1.0
 
 def draw_toggle_button(frame, paused):
@@ -32,24 +36,8 @@ def draw_toggle_button(frame, paused):
         cv2.rectangle(frame, (x1 + 34, y1 + 15), (x1 + 42, y2 - 15), (0, 0, 255), -1)
 
 def calculate_color_durations(current_frame):
-    green_time = 0.0
-    red_time = 0.0
-
-    for start, end, color in segments:
-        duration = (end - start) / video_fps
-        if color == (0, 255, 0):
-            green_time += duration
-        elif color == (0, 0, 255):
-            red_time += duration
-
-    if active_segment is not None:
-        start, color = active_segment
-        duration = (current_frame - start) / video_fps
-        if color == (0, 255, 0):
-            green_time += duration
-        elif color == (0, 0, 255):
-            red_time += duration
-
+    green_time = timeline.seconds(GREEN, current_frame, video_fps)
+    red_time = timeline.seconds(RED, current_frame, video_fps)
     return green_time, red_time
 
 def draw_buttons(frame):
@@ -84,15 +72,12 @@ def draw_buttons(frame):
     # cv2.putText(frame, '+', (x1 + 10, y2 - 12), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
 
 def summarize_usage():
-    global segments, active_segment
-
-    if active_segment is not None:
-        segments.append((active_segment[0], video_frame_count, active_segment[1]))
+    timeline.close(video_frame_count)
 
 def show_summary_screen():
     total_frames = video_frame_count
-    green_frames = sum((end - start) for start, end, color in segments if color == (0, 255, 0))
-    red_frames = sum((end - start) for start, end, color in segments if color == (0, 0, 255))
+    green_frames = timeline.frames(GREEN)
+    red_frames = timeline.frames(RED)
 
     green_percent = (green_frames / total_frames) * 100
     red_percent = (red_frames / total_frames) * 100
@@ -123,29 +108,14 @@ def show_summary_screen():
 
 
 def draw_progress_bar(frame, current_frame):
-    bar_height = 30
-    bar_top = frame.shape[0] - bar_height
-    bar_bottom = frame.shape[0]
-    width = frame.shape[1]
-
-    cv2.rectangle(frame, (0, bar_top), (width, bar_bottom), (230, 230, 230), -1)
-
-    for start, end, color in segments:
-        x1 = int((start / video_frame_count) * width)
-        x2 = int((end / video_frame_count) * width)
-        cv2.rectangle(frame, (x1, bar_top), (x2, bar_bottom), color, -1)
-
-    if active_segment is not None:
-        start, color = active_segment
-        x1 = int((start / video_frame_count) * width)
-        x2 = int((current_frame / video_frame_count) * width)
-        cv2.rectangle(frame, (x1, bar_top), (x2, bar_bottom), color, -1)
-
-    cur_x = int((current_frame / video_frame_count) * width)
-    cv2.line(frame, (cur_x, bar_top - 5), (cur_x, bar_bottom + 5), (0, 0, 0), 2)
+    global progress_bar
+    # Built once per frame width; segments are painted into it incrementally
+    if progress_bar is None or not progress_bar.matches(frame.shape[1], video_frame_count):
+        progress_bar = ProgressBarLayer(frame.shape[1], video_frame_count)
+    progress_bar.draw(frame, timeline.segments, timeline.active, current_frame)
 
 def click_event(event, x, y, flags, param):
-    global paused, active_segment, segments, playback_speed
+    global paused, playback_speed
     current_frame = param['frame_number']
 
     if event != cv2.EVENT_LBUTTONDOWN:
@@ -162,19 +132,11 @@ def click_event(event, x, y, flags, param):
         return
 
     if green_button_rect[0] <= x <= green_button_rect[2] and green_button_rect[1] <= y <= green_button_rect[3]:
-        if active_segment is None:
-            active_segment = (current_frame, (0, 255, 0))
-        else:
-            segments.append((active_segment[0], current_frame, active_segment[1]))
-            active_segment = (current_frame, (0, 255, 0))
+        timeline.switch(current_frame, GREEN)
         return
 
     if red_button_rect[0] <= x <= red_button_rect[2] and red_button_rect[1] <= y <= red_button_rect[3]:
-        if active_segment is None:
-            active_segment = (current_frame, (0, 0, 255))
-        else:
-            segments.append((active_segment[0], current_frame, active_segment[1]))
-            active_segment = (current_frame, (0, 0, 255))
+        timeline.switch(current_frame, RED)
         return
 
     # if speed_down_button_rect[0] <= x <= speed_down_button_rect[2] and speed_down_button_rect[1] <= y <= speed_down_button_rect[3]:
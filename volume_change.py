@@ -1,37 +1,152 @@
 import time
-from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
-from ctypes import cast, POINTER
-from comtypes import CLSCTX_ALL
-import comtypes
+import threading
+
+try:
+    from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+    from ctypes import cast, POINTER
+    from comtypes import CLSCTX_ALL
+    import comtypes
+except ImportError:  # Not on Windows: only the pygame mixer backend is available
+    AudioUtilities = None
+
 
 def get_volume_interface():
     devices = AudioUtilities.GetSpeakers()
     interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
     return cast(interface, POINTER(IAudioEndpointVolume))
 
+
+class VolumeBackend:
+    """Interface for something whose volume a nudge can ramp (levels are 0.0 - 1.0)."""
+
+    def get_volume(self):
+        raise NotImplementedError
+
+    def set_volume(self, level):
+        raise NotImplementedError
+
+
+class EndpointVolumeBackend(VolumeBackend):
+    """
+    Windows master volume through IAudioEndpointVolume.
+    The endpoint is activated once per thread (COM objects belong to the
+    thread that created them) and reused for every step of a ramp.
+    """
+
+    def __init__(self):
+        if AudioUtilities is None:
+            raise RuntimeError("pycaw/comtypes are not available on this system")
+        self._local = threading.local()
+
+    def _endpoint(self):
+        endpoint = getattr(self._local, 'endpoint', None)
+        if endpoint is None:
+            comtypes.CoInitialize()
+            endpoint = get_volume_interface()
+            self._local.endpoint = endpoint
+        return endpoint
+
+    def get_volume(self):
+        return self._endpoint().GetMasterVolumeLevelScalar()
+
+    def set_volume(self, level):
+        self._endpoint().SetMasterVolumeLevelScalar(level, None)
+
+
+class MixerVolumeBackend(VolumeBackend):
+    """In-process fallback that scales pygame.mixer.music (works on any OS)."""
+
+    def __init__(self):
+        import pygame
+        self._music = pygame.mixer.music
+
+    def get_volume(self):
+        return self._music.get_volume()
+
+    def set_volume(self, level):
+        self._music.set_volume(level)
+
+
+def default_backend():
+    """System volume on Windows, otherwise the pygame mixer."""
+    if AudioUtilities is not None:
+        return EndpointVolumeBackend()
+    return MixerVolumeBackend()
+
+
+class VolumeController:
+    """Volume access and the volume-boost nudge on top of one reusable backend."""
+
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else default_backend()
+
+    def get_volume(self):
+        return self.backend.get_volume()
+
+    def set_volume(self, level):
+        self.backend.set_volume(min(max(level, 0.0), 1.0))
+
+    def boost(self, cancel_event=None, waves=3, steps=10, pause=0.1, boost=0.4):
+        """
+        Wave the volume up and back down.
+        Args:
+            cancel_event (threading.Event): When set, the ramp stops early; the
+                original volume is always restored
+            waves (int): Number of up/down waves
+            steps (int): Volume steps per half wave
+            pause (float): Seconds between steps
+            boost (float): How far above the original level the peak goes
+        """
+        original_volume = self.get_volume()
+        peak_volume = min(original_volume + boost, 1.0)
+
+        def wait(seconds):
+            # Sleep, but wake up (and report True) as soon as the nudge is cancelled
+            if cancel_event is None:
+                time.sleep(seconds)
+                return False
+            return cancel_event.wait(seconds)
+
+        try:
+            for _ in range(waves):
+                for i in range(1, steps + 1):
+                    level = original_volume + (peak_volume - original_volume) * (i / steps)
+                    self.set_volume(level)
+                    if wait(pause):
+                        return
+                for i in range(1, steps + 1):
+                    level = peak_volume - (peak_volume - original_volume) * (i / steps)
+                    self.set_volume(level)
+                    if wait(pause):
+                        return
+        finally:
+            self.set_volume(original_volume)
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_controller():
+    """Shared VolumeController, created on first use."""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = VolumeController()
+        return _controller
+
+
 def set_volume(level):
-    volume = get_volume_interface()
-    volume.SetMasterVolumeLevelScalar(level, None)
+    get_controller().set_volume(level)
 
 def get_current_volume():
-    volume = get_volume_interface()
-    return volume.GetMasterVolumeLevelScalar()
-
-def volume_boost():
-    comtypes.CoInitialize()
-    original_volume = get_current_volume()
-    peak_volume = min(original_volume + 0.4, 1.0)
-    steps = 10
-    pause = 0.1
-
-    for _ in range(3):  # wave 3 times
-        for i in range(1, steps + 1):
-            level = original_volume + (peak_volume - original_volume) * (i / steps)
-            set_volume(level)
-            time.sleep(pause)
-        for i in range(1, steps + 1):
-            level = peak_volume - (peak_volume - original_volume) * (i / steps)
-            set_volume(level)
-            time.sleep(pause)
-
-    set_volume(original_volume)
+    return get_controller().get_volume()
+
+def volume_boost(cancel_event=None):
+    """
+    Wave the system volume up and back down three times.
+    Args:
+        cancel_event (threading.Event): When set, the ramp stops early; the
+            original volume is always restored
+    """
+    get_controller().boost(cancel_event=cancel_event)